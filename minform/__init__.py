@@ -8,6 +8,10 @@ __version__ = '0.2.0'
 from .core import *
 from .basic import *
 from .compound import *
+from .parser import Parser
+from .files import RecordFile, RecordLog
+from .shared import SharedTable, RecordQueue
+from . import parallel
 
 FIXED = FIXED
 r"""
@@ -0,0 +1,216 @@
+import asyncio
+import itertools
+
+
+async def iter_stream(form_class, reader, chunk_records=4096, order=None,
+                      kind='form'):
+    """
+    Asynchronously unpack back-to-back records from an
+    :class:`asyncio.StreamReader`.
+
+    See :meth:`BinaryForm.aiter_stream <minform.BinaryForm.aiter_stream>`.
+    """
+
+    size = form_class.size
+    limit = max(chunk_records, 1) * size
+
+    while True:
+        # Take as many records as have already arrived (up to a chunk), and
+        # only wait for exact byte counts to finish a straddling record.
+        data = await reader.read(limit)
+        if not data:
+            return
+        rest = -len(data) % size
+        if rest:
+            try:
+                data += await reader.readexactly(rest)
+            except asyncio.IncompleteReadError as e:
+                raise ValueError(
+                    'Stream ended {0} bytes into a {1} record'.format(
+                        (len(data) + len(e.partial)) % size,
+                        form_class.__name__))
+
+        for record in form_class.iter_unpack(data, order=order, kind=kind):
+            yield record
+
+
+async def write(form_class, writer, records, chunk_records=4096,
+                order=None):
+    """
+    Pack records back-to-back into an :class:`asyncio.StreamWriter`.
+
+    See :meth:`BinaryForm.awrite <minform.BinaryForm.awrite>`.
+    """
+
+    records = iter(records)
+    chunk_records = max(chunk_records, 1)
+    written = 0
+
+    while True:
+        batch = list(itertools.islice(records, chunk_records))
+        if not batch:
+            return written
+        # Each chunk gets a new buffer, since the transport may hold on to
+        # it until it can be sent.
+        chunk = form_class.pack_many(batch, order=order)
+        writer.write(chunk)
+        written += len(chunk)
+        await writer.drain()
+
+
+class RecordProtocol(asyncio.BufferedProtocol):
+
+    """
+    :class:`asyncio.BufferedProtocol` that decodes a stream of
+    :class:`~minform.BinaryForm` records and hands each one to a callback:
+
+    .. code-block:: python
+
+        transport, protocol = await loop.create_connection(
+            lambda: RecordProtocol(Packet, handle_packet), host, port)
+
+    The protocol owns a preallocated receive buffer, which the event loop
+    reads straight into (see :meth:`get_buffer`). Each time data arrives,
+    every complete record in the buffer is decoded in place, without
+    slicing; only the bytes of a record that straddles the end of the
+    buffer are ever moved (back to its start).
+
+    The protocol can also be used with
+    :meth:`~asyncio.loop.create_datagram_endpoint`, in which case each
+    datagram must hold a whole number of records.
+
+    Errors are reported through callbacks, rather than raised from the
+    protocol's methods (which the event loop would only log). If the stream
+    ends partway through a record, the connection is closed, and
+    *close_callback* is called with a :exc:`ValueError`. Errors that don't
+    end the connection by themselves (a datagram that isn't a whole number
+    of records, or an :exc:`OSError` passed to :meth:`error_received`) are
+    passed to *error_callback*; without one, they end the connection in the
+    same way.
+
+    Parameters:
+        form_class: the :class:`~minform.BinaryForm` subclass to decode
+        callback: called with each decoded record
+        capacity_records (int): the number of records that the receive
+            buffer can hold
+        order: see :meth:`BinaryForm.unpack <minform.BinaryForm.unpack>`
+        kind (str): ``'view'`` to decode each record as a lazy
+            :class:`~minform.views.RecordView` over the receive buffer, or
+            any of the kinds accepted by :meth:`BinaryForm.iter_unpack
+            <minform.BinaryForm.iter_unpack>`. Views are only valid until
+            the callback returns, since the buffer is then reused. Records
+            of other kinds stay valid; if they have lazy lists, which refer
+            to the buffer they were decoded from, they're decoded from a
+            copy of the receive buffer.
+        close_callback: called when the connection is closed, with
+            ``None`` if the stream ended cleanly, or with the exception that
+            ended it
+        error_callback: called with each error that doesn't end the
+            connection by itself
+
+    Attributes:
+        transport: the protocol's transport, once connected
+        exception: the exception that ended the stream, if any
+    """
+
+    transport = None
+    exception = None
+
+    def __init__(self, form_class, callback, capacity_records=4096,
+                 order=None, kind='dict', close_callback=None,
+                 error_callback=None):
+        if not form_class.size:
+            raise ValueError("Can't read records of {0}, which has no "
+                             "size".format(form_class.__name__))
+        self.form_class = form_class
+        self.callback = callback
+        self.close_callback = close_callback
+        self.error_callback = error_callback
+        if kind == 'view':
+            self._decode = lambda buffer, offset: form_class._view_at(
+                buffer, offset, order)
+            self._keeps_buffers = False
+        else:
+            self._decode = form_class._decoder(order, kind)
+            self._keeps_buffers = form_class._keeps_buffers
+
+        self._size = form_class.size
+        self._buffer = bytearray(max(capacity_records, 1) * self._size)
+        self._view = memoryview(self._buffer)
+
+        # The undecoded bytes are self._buffer[self._start:self._end].
+        self._start = 0
+        self._end = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def connection_lost(self, exc):
+        self.transport = None
+        if exc is not None and self.exception is None:
+            self.exception = exc
+        if self.close_callback is not None:
+            self.close_callback(self.exception)
+
+    def get_buffer(self, sizehint):
+        if self._start == self._end:
+            self._start = self._end = 0
+        elif len(self._buffer) - self._end < self._size:
+            # Move the partial record at the end back to the start.
+            pending = self._end - self._start
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._start = 0
+            self._end = pending
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes):
+        self._end += nbytes
+        if self._keeps_buffers:
+            buffer = bytes(self._view[self._start:self._end])
+            base = self._start
+        else:
+            buffer = self._buffer
+            base = 0
+
+        # Move past each record before handing it off, so that it isn't
+        # delivered again if the callback raises.
+        decode = self._decode
+        callback = self.callback
+        size = self._size
+        while self._end - self._start >= size:
+            record = decode(buffer, self._start - base)
+            self._start += size
+            callback(record)
+
+    def eof_received(self):
+        if self._start != self._end:
+            self.exception = ValueError(
+                'Stream ended {0} bytes into a {1} record'.format(
+                    self._end - self._start, self.form_class.__name__))
+        # Let the transport close the connection.
+        return False
+
+    def datagram_received(self, data, addr):
+        if len(data) % self._size:
+            self._error(ValueError(
+                '{0} bytes is not a whole number of {1} records'.format(
+                    len(data), self.form_class.__name__)))
+            return
+        decode = self._decode
+        callback = self.callback
+        for offset in range(0, len(data), self._size):
+            callback(decode(data, offset))
+
+    def error_received(self, exc):
+        self._error(exc)
+
+    def _error(self, exc):
+        # Report an error that doesn't end the connection by itself, or end
+        # the connection with it if there's no error_callback.
+        if self.error_callback is not None:
+            self.error_callback(exc)
+            return
+        if self.exception is None:
+            self.exception = exc
+        if self.transport is not None:
+            self.transport.close()
@@ -5,6 +5,39 @@ from wtforms.validators import Length, NumberRange
 from . import core
 
 
+# NumPy dtype kinds corresponding to the struct format characters used by
+# basic fields.
+_NUMPY_KINDS = {
+    'c': 'S1',
+    '?': '?',
+    'b': 'i1',
+    'B': 'u1',
+    'h': 'i2',
+    'H': 'u2',
+    'i': 'i4',
+    'I': 'u4',
+    'q': 'i8',
+    'Q': 'u8',
+    'f': 'f4',
+    'd': 'f8',
+}
+
+
+# The methods that determine how a basic field's values are packed.
+_CODEC_METHODS = ('pack', 'unpack', 'pack_data', 'unpack_data',
+                  '_pack_into', '_unpack_from')
+
+
+def _overrides_codec(item):
+    # Whether item's class changes how values are packed, compared to the
+    # built-in field it's derived from (e.g. by scaling them in
+    # unpack_data). If so, the item can't be packed with a bare struct.
+    cls = type(item)
+    base = next(c for c in cls.__mro__ if c.__module__ == __name__)
+    return any(getattr(cls, name) is not getattr(base, name)
+               for name in _CODEC_METHODS)
+
+
 class BasicBinaryField(core.BinaryField):
 
     # Some BinaryFields will have inherent value restrictions, based on the
@@ -17,6 +50,8 @@ class BasicBinaryField(core.BinaryField):
     def __init__(self, label='', validators=None, order=None, **kwargs):
         core.BinaryItem.__init__(self)
         self.size = struct.calcsize(self.pack_string)
+        self._structs = {}
+        self._plain = not _overrides_codec(self)
         self.order = order
 
         # Clone the initial_validators list to avoid mutating a class
@@ -32,14 +67,47 @@ class BasicBinaryField(core.BinaryField):
         return self.pack_data(data, order)
 
     def pack_data(self, data, order):
-        return struct.pack(order + self.pack_string, data)
+        return self._struct(order).pack(data)
 
     def unpack(self, buffer, order=None):
         order = self.order or order or ''
         return self.unpack_data(buffer, order)
 
     def unpack_data(self, buffer, order):
-        return struct.unpack(order + self.pack_string, buffer)[0]
+        return self._struct(order).unpack(buffer)[0]
+
+    def _pack_into(self, buffer, offset, data, order=None):
+        if not self._plain:
+            # Go through the subclass's own pack methods.
+            return core.BinaryItem._pack_into(self, buffer, offset, data,
+                                              order)
+        order = self.order or order or ''
+        self._struct(order).pack_into(buffer, offset, data)
+
+    def _unpack_from(self, buffer, offset, order=None):
+        if not self._plain:
+            return core.BinaryItem._unpack_from(self, buffer, offset, order)
+        order = self.order or order or ''
+        return self._struct(order).unpack_from(buffer, offset)[0]
+
+    def _dtype_spec(self, order=None):
+        order = self.order or order or ''
+        return core._struct_prefix(order) + _NUMPY_KINDS[self.pack_string]
+
+    def _struct(self, order):
+        # Cache the compiled struct for each byte order, rather than
+        # rebuilding the format string on every call.
+        try:
+            return self._structs[order]
+        except KeyError:
+            # setdefault, so that racing threads all keep the same struct.
+            compiled = struct.Struct(order + self.pack_string)
+            return self._structs.setdefault(order, compiled)
+
+    def struct_format(self, order=None):
+        if not self._plain:
+            return None
+        return self.order or order or '', self.pack_string
 
 
 class CharField(BasicBinaryField):
@@ -245,34 +313,73 @@ class BytesField(BasicBinaryField):
 
     def pack_data(self, data, order):
         buffer = bytearray(self.size)
+        self._pack_bytes_into(buffer, 0, data, order)
+        return buffer
+
+    def unpack_data(self, buffer, order):
+        return self._unpack_bytes_from(buffer, 0, order)
+
+    def _pack_into(self, buffer, offset, data, order=None):
+        if not self._plain:
+            return core.BinaryItem._pack_into(self, buffer, offset, data,
+                                              order)
+        self._pack_bytes_into(buffer, offset, data, order)
+
+    def _unpack_from(self, buffer, offset, order=None):
+        if not self._plain:
+            return core.BinaryItem._unpack_from(self, buffer, offset, order)
+        return self._unpack_bytes_from(buffer, offset, order)
+
+    def _pack_bytes_into(self, buffer, offset, data, order):
+        order = self.order or order or ''
         length = len(data)
+        if length > self.max_length:
+            message = "Can't pack {0} bytes into {1} bytes.".format(
+                length, self.max_length)
+            raise ValueError(message)
+
+        # The 's' format pads short strings with null bytes.
         if self.length == core.EXPLICIT:
-            pack_length_string = order + self.length_field.pack_string
-            struct.pack_into(pack_length_string, buffer, 0, length)
-            start = self.length_field.size
+            self._struct(order).pack_into(buffer, offset, length, data)
         else:
-            start = 0
-        buffer[start:start+length] = data
-        return buffer
+            self._struct(order).pack_into(buffer, offset, data)
 
-    def unpack_data(self, buffer, order):
+    def _unpack_bytes_from(self, buffer, offset, order):
+        order = self.order or order or ''
         if self.length == core.EXPLICIT:
-            unpack_length_string = order + self.length_field.pack_string
-            length = struct.unpack_from(unpack_length_string, buffer)[0]
+            length, data = self._struct(order).unpack_from(buffer, offset)
             if length > self.max_length:
                 message = "Buffer cannot contain {0} bytes.".format(length)
                 raise ValueError(message)
-            data_buffer = buffer[self.length_field.size:]
+            data = data[:length]
         else:
-            length = self.max_length
-            data_buffer = buffer
-        data = data_buffer[:length]
+            data = self._struct(order).unpack_from(buffer, offset)[0]
 
         if self.length == core.AUTOMATIC:
             data = data.rstrip(b'\x00')
 
         return data
 
+    def struct_format(self, order=None):
+        # The count prefix of an EXPLICIT field determines how much of the
+        # data is meaningful, so it can't be unpacked as a single value.
+        if self.length == core.EXPLICIT:
+            return None
+        return super(BytesField, self).struct_format(order)
+
+    def from_struct(self, value):
+        if self.length == core.AUTOMATIC:
+            return value.rstrip(b'\x00')
+        return value
+
+    def _dtype_spec(self, order=None):
+        data = 'S{0}'.format(self.max_length)
+        if self.length == core.EXPLICIT:
+            order = self.order or order or ''
+            return [('length', self.length_field._dtype_spec(order)),
+                    ('data', data)]
+        return data
+
 
 def store_numbers_up_to(n, signed=False, **kwargs):
     """
@@ -0,0 +1,284 @@
+import collections
+import itertools
+import linecache
+import weakref
+
+import six
+
+# Numbers the codecs' source "files", so that same-named forms (e.g. ones
+# created dynamically) don't overwrite each other's source in linecache.
+_codec_numbers = itertools.count(1)
+
+
+class Codec(object):
+
+    """
+    Generated pack/unpack functions for one :class:`~minform.BinaryForm`
+    subclass in one byte order.
+
+    A codec is built from the form's compiled :class:`~minform.core.Layout`
+    the first time the form is used with a byte order (see
+    :meth:`BinaryForm.codec <minform.BinaryForm.codec>`). Its functions are
+    straight-line Python with the struct calls, offsets and field names
+    baked in, so packing and unpacking don't dispatch through the items'
+    methods at all. Nested forms are inlined too (see
+    :class:`~minform.core.Layout`), so their dicts are built directly by
+    the generated code.
+
+    Attributes:
+        form_class: The :class:`~minform.BinaryForm` subclass.
+        order: The byte order that the codec was generated for.
+        size (int): The number of bytes in a packed buffer.
+        source (str): The Python source of the generated functions. It is
+            also registered with :mod:`linecache`, so tracebacks and
+            debuggers can show it.
+        field_names (tuple): The names of the form's fields, in the order
+            they're packed.
+        struct: A :class:`struct.Struct` whose values are exactly the
+            form's data in :attr:`field_names` order, if there is one;
+            otherwise ``None``.
+        unpack_from: ``unpack_from(buffer, offset=0)`` returns a dict of the
+            data stored at *offset* in *buffer*.
+        unpack_values_from: ``unpack_values_from(buffer, offset=0)`` returns
+            the same data as a tuple, in :attr:`field_names` order.
+        pack_into: ``pack_into(buffer, offset, data)`` writes a dict of data
+            into a mutable *buffer*.
+        pack: ``pack(data)`` packs a dict of data into a ``bytes`` object.
+    """
+
+    def __init__(self, form_class, layout):
+        self.form_class = form_class
+        self.order = layout.order
+        self.size = layout.size
+
+        nested = _is_nested(layout)
+        namespace = {'SIZE': layout.size}
+        lines = []
+        lines.extend(_unpack_source(layout, namespace, 'unpack_from', dict))
+        lines.append('')
+        lines.extend(_unpack_source(layout, namespace, 'unpack_values_from',
+                                    tuple))
+        lines.append('')
+        lines.extend(_pack_into_source(layout, namespace, nested))
+        lines.append('')
+        lines.extend(_pack_source(layout, namespace, nested))
+        if nested:
+            lines.append('')
+            lines.extend(_pack_items_source(layout, namespace))
+        self.source = '\n'.join(lines) + '\n'
+
+        self.filename = '<minform codec {0}.{1} {2!r} #{3}>'.format(
+            form_class.__module__, form_class.__name__, self.order,
+            next(_codec_numbers))
+        code = compile(self.source, self.filename, 'exec')
+        linecache.cache[self.filename] = (len(self.source), None,
+                                          self.source.splitlines(True),
+                                          self.filename)
+        if hasattr(weakref, 'finalize'):
+            # Forget the source once the codec (and so its form) is gone.
+            weakref.finalize(self, linecache.cache.pop, self.filename, None)
+        six.exec_(code, namespace)
+
+        self.field_names = tuple(slot.name for slot in layout.slots
+                                 if slot.has_field)
+        if nested or any(slot.converts for slot in layout.slots):
+            self.struct = None
+        else:
+            self.struct = layout.struct
+        self.unpack_from = namespace['unpack_from']
+        self.unpack_values_from = namespace['unpack_values_from']
+        self.pack_into = namespace['pack_into']
+        self.pack = namespace['pack']
+
+    def __repr__(self):
+        return '<Codec {0} {1!r}>'.format(self.form_class.__name__,
+                                          self.order)
+
+
+def _offset(offset):
+    if offset:
+        return 'offset + {0}'.format(offset)
+    return 'offset'
+
+
+def _is_nested(layout):
+    return any(kind != 'item' for path, kind, slot in layout.nodes)
+
+
+def _unpack_source(layout, namespace, function_name, result_type):
+    lines = ['def {0}(buffer, offset=0):'.format(function_name)]
+    values = {}
+
+    for index, step in enumerate(layout.steps):
+        start = _offset(step.offset)
+
+        if step.struct is not None:
+            if not step.fields:
+                continue
+            namespace['unpack_{0}'.format(index)] = step.struct.unpack_from
+            names = []
+            for slot in step.fields:
+                name = 'v{0}'.format(slot.index)
+                names.append(name)
+                if slot.converts:
+                    converter = 'convert_{0}'.format(name)
+                    namespace[converter] = slot.item.from_struct
+                    value = '{0}({1})'.format(converter, name)
+                else:
+                    value = name
+                values[slot.path] = value
+            lines.append('    {0}, = unpack_{1}(buffer, {2})'.format(
+                ', '.join(names), index, start))
+
+        else:
+            slot = step.slot
+            namespace['unpack_{0}'.format(index)] = slot.item._unpack_from
+            call = 'unpack_{0}(buffer, {1}, {2!r})'.format(
+                index, start, slot.order)
+            if slot.has_field:
+                name = 'v{0}'.format(slot.index)
+                lines.append('    {0} = {1}'.format(name, call))
+                values[slot.path] = name
+            else:
+                lines.append('    ' + call)
+
+    results = _result_tree(layout, values)
+    if result_type is dict:
+        lines.append('    return ' + _render(('dict', results)))
+    else:
+        lines.append('    return (' + ''.join(
+            '{0}, '.format(_render(value)) for value in results.values()) +
+            ')')
+    return lines
+
+
+def _result_tree(layout, values):
+    # Nest the unpacked value expressions the way the data is nested. Each
+    # inlined form or list becomes a (kind, children) pair.
+    root = collections.OrderedDict()
+    containers = {(): root}
+    for path, kind, slot in layout.nodes:
+        parent = containers[path[:-1]]
+        if kind == 'item':
+            if slot.has_field:
+                parent[path[-1]] = values[path]
+        else:
+            children = containers[path] = collections.OrderedDict()
+            parent[path[-1]] = (kind, children)
+    return root
+
+
+def _render(value):
+    if isinstance(value, six.string_types):
+        return value
+    kind, children = value
+    if kind == 'list':
+        return '[' + ', '.join(_render(child)
+                               for child in children.values()) + ']'
+    return '{' + ', '.join('{0!r}: {1}'.format(key, _render(child))
+                           for key, child in children.items()) + '}'
+
+
+def _pack_into_source(layout, namespace, nested):
+    lines = ['def pack_into(buffer, offset, data):']
+    indent = '    '
+
+    # Look up each inlined form's (or list's) data once, up front.
+    containers = {(): 'data'}
+    if nested:
+        lines.append('    try:')
+        indent = '        '
+        for path, kind, slot in layout.nodes:
+            if kind == 'item':
+                continue
+            name = 'c{0}'.format(len(containers) - 1)
+            lines.append('{0}{1} = {2}[{3!r}]'.format(
+                indent, name, containers[path[:-1]], path[-1]))
+            containers[path] = name
+        for path, count in layout.lists:
+            lines.append('{0}if len({1}) != {2}:'.format(
+                indent, containers[path], count))
+            lines.append('{0}    return pack_items(buffer, offset, data)'
+                         .format(indent))
+
+    def value(slot):
+        return '{0}[{1!r}]'.format(containers[slot.path[:-1]], slot.path[-1])
+
+    for index, step in enumerate(layout.steps):
+        start = _offset(step.offset)
+
+        if step.struct is not None:
+            namespace['pack_into_{0}'.format(index)] = step.struct.pack_into
+            args = ['buffer', start]
+            args.extend(_checked(slot, value(slot), namespace)
+                        for slot in step.fields)
+            lines.append('{0}pack_into_{1}({2})'.format(
+                indent, index, ', '.join(args)))
+
+        else:
+            slot = step.slot
+            namespace['pack_{0}'.format(index)] = slot.item._pack_into
+            lines.append('{0}pack_{1}(buffer, {2}, {3}, {4!r})'.format(
+                indent, index, start,
+                value(slot) if slot.has_field else 'None', slot.order))
+
+    if nested:
+        # Data that doesn't fit the flat plan (e.g. partial nested dicts, or
+        # lists with missing entries) is packed item by item instead, which
+        # handles it the way the nested items always have.
+        lines.append('    except (KeyError, IndexError, TypeError):')
+        lines.append('        pack_items(buffer, offset, data)')
+    elif len(lines) == 1:
+        lines.append('    pass')
+    return lines
+
+
+def _pack_source(layout, namespace, nested):
+    lines = ['def pack(data):']
+
+    if layout.struct is not None and layout.steps and not nested:
+        # The whole form is a single struct, so there's no need for an
+        # intermediate buffer.
+        step = layout.steps[0]
+        namespace['pack_struct'] = step.struct.pack
+        args = ', '.join(_checked(slot, 'data[{0!r}]'.format(slot.name),
+                                  namespace)
+                         for slot in step.fields)
+        lines.append('    return pack_struct({0})'.format(args))
+
+    else:
+        lines.append('    buffer = bytearray(SIZE)')
+        lines.append('    pack_into(buffer, 0, data)')
+        lines.append('    return bytes(buffer)')
+
+    return lines
+
+
+def _checked(slot, value, namespace):
+    # Wrap a packed value's expression in a length check, for the string
+    # slots that struct would otherwise truncate.
+    if slot.max_length is None:
+        return value
+    namespace['check_length'] = _check_length
+    return 'check_length({0}, {1})'.format(value, slot.max_length)
+
+
+def _check_length(data, max_length):
+    if len(data) > max_length:
+        raise ValueError("Can't pack {0} bytes into {1} bytes.".format(
+            len(data), max_length))
+    return data
+
+
+def _pack_items_source(layout, namespace):
+    # Pack each of the form's own items with its own method.
+    lines = ['def pack_items(buffer, offset, data):']
+    for slot in layout.slots:
+        namespace['item_{0}'.format(slot.index)] = slot.item._pack_into
+        if slot.has_field:
+            value = 'data[{0!r}]'.format(slot.name)
+        else:
+            value = 'None'
+        lines.append('    item_{0}(buffer, {1}, {2}, {3!r})'.format(
+            slot.index, _offset(slot.offset), value, slot.order))
+    return lines
@@ -0,0 +1,166 @@
+import array
+import sys
+
+import six
+
+
+# Struct format characters that array.array can store with the same
+# meaning (if the platform's item sizes match).
+_TYPECODES = 'bBhHiIqQfd'
+
+_NATIVE_ORDER = '<' if sys.byteorder == 'little' else '>'
+
+
+def column_typecode(slot):
+    """
+    Get the :mod:`array` typecode that can hold a layout slot's values, or
+    ``None`` if the slot isn't a plain numeric field.
+    """
+
+    fmt = slot.format
+    if fmt is None or slot.converts or fmt not in _TYPECODES:
+        return None
+    if array.array(fmt).itemsize != slot.size:
+        return None
+    return fmt
+
+
+def unpack_columns(layout, buffer, count, offset):
+    """
+    Decode *count* back-to-back records into a dict of columns.
+
+    Numeric fields are gathered into ``array.array`` columns a byte lane at
+    a time (one strided slice per byte of the field), then byteswapped in
+    bulk if their byte order isn't the native one. Other fields are decoded
+    into lists.
+    """
+
+    view = memoryview(buffer)
+    size = layout.size
+    stop = offset + count * size
+    columns = {}
+
+    for slot in layout.slots:
+        if not slot.has_field:
+            continue
+
+        start = offset + slot.offset
+        typecode = column_typecode(slot)
+
+        if typecode is None:
+            unpack_from = slot.item._unpack_from
+            order = slot.order
+            columns[slot.name] = [
+                unpack_from(buffer, start + i * size, order)
+                for i in six.moves.range(count)]
+            continue
+
+        width = slot.size
+        gathered = bytearray(count * width)
+        for lane in six.moves.range(width):
+            gathered[lane::width] = view[start + lane:stop:size]
+
+        column = array.array(typecode)
+        if six.PY2:  # pragma: no cover
+            column.fromstring(bytes(gathered))
+        else:
+            column.frombytes(gathered)
+        if width > 1 and slot.prefix not in ('=', _NATIVE_ORDER):
+            column.byteswap()
+        columns[slot.name] = column
+
+    return columns
+
+
+def column_count(layout, columns):
+    """
+    Check that *columns* has one equally long column per field of a layout,
+    and return that length.
+    """
+
+    names = set(slot.name for slot in layout.slots if slot.has_field)
+    missing = names.difference(columns)
+    if missing:
+        raise ValueError('Missing columns: {0}'.format(
+            ', '.join(sorted(missing))))
+    unknown = set(columns).difference(names)
+    if unknown:
+        raise ValueError('Unknown columns: {0}'.format(
+            ', '.join(sorted(unknown))))
+
+    lengths = set(len(column) for column in columns.values())
+    if len(lengths) > 1:
+        raise ValueError('Columns have different lengths: {0}'.format(
+            ', '.join(str(length) for length in sorted(lengths))))
+    return lengths.pop() if lengths else 0
+
+
+def pack_columns(layout, columns, buffer, count, offset=0):
+    """
+    Pack *count* records from a dict of columns into *buffer*.
+
+    This is the inverse of :func:`unpack_columns`. Numeric columns are
+    converted to packed bytes a whole column at a time (with NumPy's
+    ``astype`` for NumPy arrays, or ``array.array`` otherwise) and scattered
+    into the records a byte lane at a time; other fields are packed one
+    value at a time.
+    """
+
+    view = memoryview(buffer)
+    size = layout.size
+    stop = offset + count * size
+
+    for slot in layout.slots:
+        start = offset + slot.offset
+
+        if not slot.has_field:
+            item = slot.item
+            for i in six.moves.range(count):
+                item._pack_into(buffer, start + i * size, None, slot.order)
+            continue
+
+        values = columns[slot.name]
+        typecode = column_typecode(slot)
+
+        if typecode is None:
+            pack_into = slot.item._pack_into
+            order = slot.order
+            for i, value in enumerate(values):
+                pack_into(buffer, start + i * size, value, order)
+            continue
+
+        width = slot.size
+        packed = _column_bytes(slot, typecode, values)
+        for lane in six.moves.range(width):
+            view[start + lane:stop:size] = packed[lane::width]
+
+
+def _column_bytes(slot, typecode, values):
+    # Get the packed bytes of a whole numeric column, in the slot's byte
+    # order.
+
+    if hasattr(values, 'astype') and hasattr(values, 'tobytes'):
+        # A NumPy array (or something very like one) can be converted to
+        # the packed dtype directly, once it's been checked the way
+        # array.array checks values: astype would silently wrap integers
+        # that are out of range, and truncate floats.
+        import numpy
+        dtype = numpy.dtype(slot.item._dtype_spec(slot.order))
+        if dtype.kind in 'iu':
+            if values.dtype.kind not in 'biu':
+                raise TypeError("Can't pack {0} values into {1}".format(
+                    values.dtype, slot.name))
+            info = numpy.iinfo(dtype)
+            if len(values) and (values.min() < info.min or
+                                values.max() > info.max):
+                raise OverflowError('{0} values must be between {1} and '
+                                    '{2}'.format(slot.name, info.min,
+                                                 info.max))
+        return memoryview(values.astype(dtype).tobytes())
+
+    column = array.array(typecode, values)
+    if slot.size > 1 and slot.prefix not in ('=', _NATIVE_ORDER):
+        column.byteswap()
+    if six.PY2:  # pragma: no cover
+        return memoryview(column.tostring())
+    return memoryview(column).cast('B')
@@ -1,7 +1,24 @@
+import struct
 import wtforms
 
 from . import core
 from . import basic
+from . import views
+
+
+# The most entries that a FIXED list of forms can have and still be inlined
+# into its parent form's layout.
+_MAX_INLINE_ENTRIES = 64
+
+
+def _repeatable(item):
+    # Whether count consecutive entries of item can be described by putting
+    # count in front of its format: true for single struct codes (numbers,
+    # chars and bools), but not for formats like '3s' or 'B3s', or for items
+    # that convert what struct unpacks or override how they're packed.
+    return (isinstance(item, basic.BasicBinaryField) and
+            len(item.pack_string) == 1 and item._plain and
+            type(item).from_struct is core.BinaryItem.from_struct)
 
 
 class BinaryFieldList(core.BinaryField):
@@ -22,11 +39,15 @@ class BinaryFieldList(core.BinaryField):
             ``prefix_length`` follows the documentation for :ref:`length`.
         form_field: A :class:`wtforms.fields.FieldList`
             instance.
+        lazy: If ``True``, unpacking returns a
+            :class:`~minform.views.ReadOnlyListView` over the buffer instead of
+            a list, and entries are only decoded when they're used. This saves
+            a lot of memory for very long lists.
     """
 
     def __init__(self, inner_field, label='', validators=None,
                  max_entries=None, length=core.EXPLICIT, order=None,
-                 **kwargs):
+                 lazy=False, **kwargs):
         core.BinaryField.__init__(self)
         if max_entries is None:
             raise ValueError("BinaryFieldList must have a max_entries "
@@ -37,67 +58,136 @@ class BinaryFieldList(core.BinaryField):
         self.max_entries = max_entries
         self.length = length
         self.order = order
+        self.lazy = lazy
 
         data_size = inner_field.size * max_entries
         if length == core.FIXED:
-            self.size = data_size
+            self.prefix_size = 0
         else:
             self.count_field = basic.store_numbers_up_to(max_entries,
                                                          order=order)
-            self.size = self.count_field.size + data_size
+            self.prefix_size = self.count_field.size
             kwargs['default'] = []
+        self.size = self.prefix_size + data_size
 
         self.inner_field = inner_field
+        if _repeatable(inner_field):
+            # Lists of plain numbers (or chars, or bools) are packed and
+            # unpacked with a single struct call, using a repeated format
+            # like '<500H', instead of one call per entry.
+            self._entries_structs = {}
+        else:
+            self._entries_structs = None
+
         unbound_field = self.inner_field.form_field
         self.form_field = wtforms.FieldList(unbound_field, label, validators,
                                             max_entries=max_entries, **kwargs)
 
     def pack(self, data, order=None):
-        order = order or self.order
         buffer = bytearray(self.size)
+        self._pack_into(buffer, 0, data, order)
+        return buffer
+
+    def unpack(self, buffer, order=None):
+        return self._unpack_from(buffer, 0, order)
+
+    def _pack_into(self, buffer, offset, data, order=None):
+        order = order or self.order
+        if len(data) > self.max_entries:
+            raise ValueError("Can't pack {0} entries into {1}".format(
+                len(data), self.name))
 
         # If the length is EXPLICIT, prepend an item count so that we will
         # know how many items to read.
 
         if self.length == core.EXPLICIT:
-            packed_count = self.count_field.pack(len(data))
-            buffer[0:self.count_field.size] = packed_count
-            start = self.count_field.size
+            self.count_field._pack_into(buffer, offset, len(data))
+            start = offset + self.count_field.size
         else:
-            start = 0
+            start = offset
 
-        for item in data:
-            stop = start + self.inner_field.size
-            buffer[start:stop] = self.inner_field.pack(item, order)
-            start = stop
+        inner_field = self.inner_field
+        if self._entries_structs is not None:
+            entries = self._entries_struct(order, len(data))
+            entries.pack_into(buffer, start, *data)
+            start += entries.size
+        else:
+            step = inner_field.size
+            for item in data:
+                inner_field._pack_into(buffer, start, item, order)
+                start += step
 
-        return buffer
+        # Unused entries are always packed as null bytes.
+        stop = offset + self.size
+        if start < stop:
+            buffer[start:stop] = b'\0' * (stop - start)
 
-    def unpack(self, buffer, order=None):
+    def _unpack_from(self, buffer, offset, order=None):
+        order = order or self.order
+        data_length = self._count_from(buffer, offset)
+        if self.lazy:
+            return views.ReadOnlyListView(self, buffer, offset, order,
+                                          (0, 1, data_length))
+        start = offset + self.prefix_size
+        inner_field = self.inner_field
+        if self._entries_structs is not None:
+            entries = self._entries_struct(order, data_length)
+            return list(entries.unpack_from(buffer, start))
+        step = inner_field.size
+        return [inner_field._unpack_from(buffer, start + i * step, order)
+                for i in range(data_length)]
+
+    def _entries_struct(self, order, count):
+        # Get the struct for count consecutive entries of a basic inner
+        # field, caching one per byte order and count.
+        inner_field = self.inner_field
+        order = inner_field.order or order or ''
+        key = (order, count)
+        try:
+            return self._entries_structs[key]
+        except KeyError:
+            compiled = struct.Struct('{0}{1}{2}'.format(
+                order, count, inner_field.pack_string))
+            return self._entries_structs.setdefault(key, compiled)
+
+    def _view_from(self, buffer, offset, order=None):
         order = order or self.order
-        data = []
+        return views.ListView(self, buffer, offset, order)
+
+    def _keeps_buffer(self):
+        return self.lazy or self.inner_field._keeps_buffer()
+
+    def _dtype_spec(self, order=None):
+        order = order or self.order
+        entries = (self.inner_field._dtype_spec(order), (self.max_entries,))
+        if self.length == core.EXPLICIT:
+            return [('count', self.count_field._dtype_spec()),
+                    ('entries', entries)]
+        return entries
+
+    def _inline_layout(self, order=None):
+        # FIXED lists of forms are inlined into the parent's layout, entry by
+        # entry, as long as that doesn't make the plan unreasonably long.
+        if (self.length != core.FIXED or self.lazy or
+                self.max_entries > _MAX_INLINE_ENTRIES):
+            return None
+        layout = self.inner_field._inline_layout(order or self.order)
+        if not isinstance(layout, core.Layout):
+            return None
+        return [layout] * self.max_entries
+
+    def _count_from(self, buffer, offset):
 
         # If the length is EXPLICIT, use the prepended item count indicator to
         # detect how many items we should read.
 
         if self.length == core.EXPLICIT:
-            count_chunk = buffer[0:self.count_field.size]
-            data_length = self.count_field.unpack(count_chunk)
+            data_length = self.count_field._unpack_from(buffer, offset)
             if data_length > self.max_entries:
                 raise ValueError("Unreasonable count of {0} for {1}".format(
                     data_length, self.name))
-            start = self.count_field.size
-        else:
-            data_length = self.max_entries
-            start = 0
-
-        for i in range(data_length):
-            stop = start + self.inner_field.size
-            chunk = buffer[start:stop]
-            data.append(self.inner_field.unpack(chunk, order))
-            start = stop
-
-        return data
+            return data_length
+        return self.max_entries
 
 
 class BinaryFormField(core.BinaryField):
@@ -130,8 +220,38 @@ class BinaryFormField(core.BinaryField):
 
     def pack(self, data, order=None):
         order = order or self.order
-        return self.form_class(data=data).pack(order)
+        try:
+            return self.form_class.codec(order).pack(data)
+        except (KeyError, TypeError):
+            # Let the form fill in any data that's missing.
+            return self.form_class(data=data).pack(order)
 
     def unpack(self, buffer, order=None):
         order = order or self.order
-        return self.form_class.unpack(buffer, order=order).data
+        return self.form_class.unpack_dict(buffer, order=order)
+
+    def _pack_into(self, buffer, offset, data, order=None):
+        order = order or self.order
+        codec = self.form_class.codec(order)
+        try:
+            codec.pack_into(buffer, offset, data)
+        except (KeyError, TypeError):
+            codec.pack_into(buffer, offset, self.form_class(data=data).data)
+
+    def _unpack_from(self, buffer, offset, order=None):
+        order = order or self.order
+        return self.form_class.codec(order).unpack_from(buffer, offset)
+
+    def _view_from(self, buffer, offset, order=None):
+        order = order or self.order
+        return self.form_class._view_at(buffer, offset, order)
+
+    def _keeps_buffer(self):
+        return self.form_class._keeps_buffers
+
+    def _dtype_spec(self, order=None):
+        order = order or self.order
+        return self.form_class._dtype_spec(order)
+
+    def _inline_layout(self, order=None):
+        return self.form_class._layout(order or self.order)
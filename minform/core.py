@@ -1,7 +1,19 @@
 import abc
+import collections
+import copy
+import errno
+import io
+import struct
+import threading
+
 import six
 import wtforms
 
+from . import columns as columnar
+from .codec import Codec
+from .projection import Projection
+from .views import view_class
+
 FIXED = 'fixed'
 EXPLICIT = 'explicit'
 AUTOMATIC = 'automatic'
@@ -11,13 +23,81 @@ LITTLE_ENDIAN = '<'
 BIG_ENDIAN = '>'
 NETWORK = '!'
 
+RECORD_KINDS = ('form', 'dict', 'tuple')
+
+BYTE_ORDERS = ('', NATIVE, LITTLE_ENDIAN, BIG_ENDIAN, NETWORK)
+
+_HAS_ITER_UNPACK = hasattr(struct.Struct, 'iter_unpack')
+
 _creation_id = 0
+_creation_lock = threading.Lock()
+
+# Guards the first population of the compiled caches on form classes, so
+# that every thread gets the same layout, codec, etc. Reentrant, because
+# compiling one form's caches can compile those of the forms nested in it.
+_cache_lock = threading.RLock()
+
+
+def _checked_offset(buffer, offset, size):
+    # Resolve a (possibly negative) offset into buffer, without slicing it.
+    # Returns None if there aren't size bytes available from there.
+    length = len(buffer)
+    if offset < 0:
+        offset += length
+    if offset < 0 or offset + size > length:
+        return None
+    return offset
+
+
+def _write_all(fileobj, data):
+    # Raw (unbuffered) files may write less than they're given, or nothing
+    # at all (returning None) if they're non-blocking and not ready. Other
+    # files that return None (like Python 2's) have written everything.
+    total = 0
+    while len(data):
+        written = fileobj.write(data)
+        if written is None:
+            if isinstance(fileobj, io.RawIOBase):
+                raise io.BlockingIOError(
+                    errno.EAGAIN, 'Write would block with {0} bytes left'
+                    .format(len(data)), total)
+            break
+        total += written
+        data = data[written:]
+
+
+def _unpickle_packed(form_class, buffer):
+    return form_class.unpack(buffer)
+
+
+def _unpickle_data(form_class, data):
+    return form_class(data=data)
+
+
+def _deepcopy_fields(fields, memo):
+    # Bound wtforms fields can't be deep-copied the usual way, since
+    # Field.__new__ makes an UnboundField unless it's given a form. Copy
+    # them (and the fields inside them) directly, and put the copies in the
+    # memo, so that deepcopy uses them wherever the fields are referred to.
+    for field in fields:
+        if id(field) in memo:
+            continue
+        clone = object.__new__(type(field))
+        memo[id(field)] = clone
+        _deepcopy_fields(getattr(field, 'entries', ()), memo)
+        form = getattr(field, 'form', None)
+        if isinstance(form, wtforms.Form):
+            _deepcopy_fields(form._fields.values(), memo)
+        clone.__dict__.update(copy.deepcopy(field.__dict__, memo))
 
 
 def _new_creation_id():
+    # Items are ordered within their form by these ids, so they must be
+    # unique even when forms are defined in several threads at once.
     global _creation_id
-    _creation_id += 1
-    return _creation_id
+    with _creation_lock:
+        _creation_id += 1
+        return _creation_id
 
 
 class BinaryItem(six.with_metaclass(abc.ABCMeta, object)):
@@ -96,44 +176,104 @@ class BinaryItem(six.with_metaclass(abc.ABCMeta, object)):
         Pack data from this item into an existing buffer.
 
         Parameters:
-            buffer: a mutable byte buffer (e.g. ``bytearray``), into which the
-                data will be written
+            buffer: a mutable byte buffer (e.g. ``bytearray``, a writable
+                ``memoryview`` or ``mmap``), into which the data will be
+                written directly
             offset (int): the starting index of *buffer* to write data to
             data: see :meth:`pack`
             order: see :meth:`pack`
         """
 
-        if offset == -self.size:
-            stop_index = None
-        else:
-            stop_index = offset + self.size
-
-        if len(buffer[offset:stop_index]) < self.size:
+        start = _checked_offset(buffer, offset, self.size)
+        if start is None:
             raise ValueError("Need at least {0} bytes to pack {1}".format(
                 self.size, data))
-        buffer[offset:stop_index] = self.pack(data, order=order)
+        self._pack_into(buffer, start, data, order)
 
     def unpack_from(self, buffer, offset=0, order=None):
         """
         Unpack data from a specific portion of a buffer.
 
         Parameters:
-            buffer: a byte buffer (e.g. a ``bytes`` object) that contains the
-                serialized data at some offset
+            buffer: any byte buffer (e.g. ``bytes``, ``bytearray``,
+                ``memoryview`` or ``mmap``) that contains the serialized data
+                at some offset. The data is decoded in place, without copying
+                the buffer.
             offset (int): the index in *buffer* where the serialized data
                 starts
             order: see :meth:`unpack`
         """
 
-        if offset == -self.size:
-            stop_index = None
-        else:
-            stop_index = offset + self.size
+        start = _checked_offset(buffer, offset, self.size)
+        if start is None:
+            raise ValueError("{0} bytes is too small for a {1}".format(
+                len(buffer), self.__class__.__name__))
+        return self._unpack_from(buffer, start, order)
+
+    # The unchecked halves of pack_into and unpack_from. The offset has
+    # already been normalized and bounds-checked, so subclasses that can work
+    # on the buffer in place (rather than on a slice of it) override these.
+
+    def _pack_into(self, buffer, offset, data, order=None):
+        buffer[offset:offset + self.size] = self.pack(data, order=order)
+
+    def _unpack_from(self, buffer, offset, order=None):
+        return self.unpack(buffer[offset:offset + self.size], order=order)
+
+    # Return the value for this item in a lazy record view; compound items
+    # return nested views instead of decoding everything up front.
+
+    def _view_from(self, buffer, offset, order=None):
+        return self._unpack_from(buffer, offset, order)
+
+    # Describe this item as a NumPy dtype, in plain Python data (so that
+    # NumPy needn't be imported until the dtype is actually built). Items
+    # without a more specific mapping are exposed as raw bytes.
+
+    def _dtype_spec(self, order=None):
+        return 'V{0}'.format(self.size)
+
+    # Return the compiled Layout of the nested form that this item packs (or
+    # a list of them, one per entry), so that a parent form's layout can
+    # inline the nested items instead of calling this item's methods. Items
+    # that aren't made of nested forms return None.
+
+    def _inline_layout(self, order=None):
+        return None
 
-        if len(buffer[offset:stop_index]) < self.size:
-            raise ValueError("{0} is too small for a {1}".format(
-                buffer, self.__class__.__name__))
-        return self.unpack(buffer[offset:stop_index], order=order)
+    # Whether the values this item unpacks can refer back to the buffer
+    # they were unpacked from (like lazy lists), so that the buffer mustn't
+    # be reused while they're alive.
+
+    def _keeps_buffer(self):
+        return False
+
+    def struct_format(self, order=None):
+        """
+        Describe this item's packed layout as a :mod:`struct` format.
+
+        Forms use this to merge consecutive fixed-layout items into a single
+        precompiled :class:`struct.Struct`. Items that return ``None`` (the
+        default) are packed and unpacked with :meth:`pack` and :meth:`unpack`.
+
+        Parameters:
+            order: the :ref:`byte order <byte-order>` of the containing form
+                or field.
+
+        Returns:
+            tuple: ``(order, format)``, where *format* is a struct format
+            string with no byte order prefix that yields a single value (or
+            none, for padding), and *order* is the byte order the item will
+            actually use, or ``None`` if byte order doesn't matter.
+        """
+        return None
+
+    def from_struct(self, value):
+        """
+        Convert a value unpacked with :meth:`struct_format` into the data
+        that :meth:`unpack` would have returned.
+        """
+        return value
 
 
 class BlankBytes(BinaryItem):
@@ -162,6 +302,7 @@ class BlankBytes(BinaryItem):
     def __init__(self, size):
         super(BlankBytes, self).__init__()
         self.size = size
+        self._padding = struct.Struct('{0}x'.format(size))
 
     def pack(self, data, order=None):
         return b'\0' * self.size
@@ -169,6 +310,15 @@ class BlankBytes(BinaryItem):
     def unpack(self, buffer, order=None):
         return None
 
+    def _pack_into(self, buffer, offset, data, order=None):
+        self._padding.pack_into(buffer, offset)
+
+    def _unpack_from(self, buffer, offset, order=None):
+        return None
+
+    def struct_format(self, order=None):
+        return None, '{0}x'.format(self.size)
+
 
 class BinaryField(BinaryItem):
 
@@ -196,6 +346,224 @@ class BinaryField(BinaryItem):
     """
 
 
+def _import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('NumPy is required for this feature; install it '
+                          'with "pip install numpy".')
+    return numpy
+
+
+def _struct_prefix(order):
+    # The empty string and '@' mean native byte order *and* native alignment
+    # to the struct module, which would pad merged formats; items are always
+    # packed back-to-back, so use the unaligned native prefix instead.
+    if order in ('', '@'):
+        return NATIVE
+    elif order == NETWORK:
+        return BIG_ENDIAN
+    return order
+
+
+class _Slot(object):
+
+    # Placement of a single BinaryItem within a packed form, along with its
+    # struct format (if it has one) for a particular form byte order.
+
+    def __init__(self, index, item, offset, order):
+        self.index = index
+        self.item = item
+        self.name = item.name
+        self.path = (item.name,)
+        self.offset = offset
+        self.size = item.size
+        self.has_field = item.form_field is not None
+        self.converts = type(item).from_struct is not BinaryItem.from_struct
+
+        # Mirror the arguments that BinaryForm has always passed to items
+        # without form fields.
+        self.order = order if self.has_field else None
+
+        self.prefix = None
+        self.format = None
+        self.value_count = 0
+        self.max_length = None
+
+        spec = item.struct_format(self.order)
+        if spec is None:
+            return
+
+        prefix, fmt = spec
+        if prefix is not None:
+            prefix = _struct_prefix(prefix)
+        compiled = struct.Struct((prefix or NATIVE) + fmt)
+        value_count = len(compiled.unpack(b'\0' * compiled.size))
+
+        if compiled.size != self.size:
+            return
+        if value_count != (1 if self.has_field else 0):
+            return
+
+        self.prefix = prefix
+        self.format = fmt
+        self.value_count = value_count
+        if value_count and fmt.endswith('s'):
+            # struct silently truncates long strings, so the codec has to
+            # check their length the way the item would.
+            self.max_length = compiled.size
+
+    @property
+    def is_fixed(self):
+        return self.format is not None
+
+    def moved(self, index, offset, path):
+        # Copy this slot to a new place in a flattened layout.
+        slot = copy.copy(self)
+        slot.index = index
+        slot.offset = offset
+        slot.path = path
+        return slot
+
+
+def _run_prefix(slots):
+    for slot in slots:
+        if slot.prefix is not None:
+            return slot.prefix
+    return None
+
+
+class _StructRun(object):
+
+    # A run of consecutive fixed-layout slots, handled by one struct call.
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.offset = slots[0].offset
+        self.size = sum(slot.size for slot in slots)
+        self.prefix = _run_prefix(slots) or NATIVE
+        fmt = ''.join(slot.format for slot in slots)
+        self.struct = struct.Struct(self.prefix + fmt)
+        self.fields = [slot for slot in slots if slot.value_count]
+
+
+class _ItemStep(object):
+
+    # A slot that can't be expressed as a struct format, and falls back to
+    # the item's own pack/unpack methods.
+
+    struct = None
+
+    def __init__(self, slot):
+        self.slot = slot
+        self.offset = slot.offset
+        self.size = slot.size
+        self.fields = [slot] if slot.has_field else []
+
+
+class Layout(object):
+
+    """
+    Compiled packing plan for a :class:`BinaryForm` in one byte order.
+
+    Layouts are pure descriptions; the functions that actually pack and
+    unpack data are generated from them by :class:`~minform.codec.Codec`.
+
+    Nested :class:`~minform.BinaryFormField` items, and
+    :data:`~minform.FIXED` lists of them, are inlined: their own items
+    become part of the parent's plan, so nesting doesn't add any calls, and
+    the nested dicts are only rebuilt from the unpacked values at the end.
+
+    Consecutive fixed-layout items (see :meth:`BinaryItem.struct_format`)
+    are merged into the longest possible runs, each of which is packed and
+    unpacked by a single precompiled :class:`struct.Struct`. Any other items
+    are handled by their own :meth:`~BinaryItem.pack` and
+    :meth:`~BinaryItem.unpack` methods.
+
+    Attributes:
+        order: the form-level byte order that the layout was compiled for.
+        size (int): the number of bytes in a packed buffer.
+        slots: the form's own items, in buffer order.
+        nodes: the flattened plan, as ``(path, kind, slot)`` tuples in
+            buffer order. *path* is a tuple of the keys (field names, and
+            entry indices for lists) that lead to the value, and *kind* is
+            ``'item'`` for an inlined item (with its *slot*), or ``'dict'``
+            or ``'list'`` for an inlined form or list (whose *slot* is
+            ``None``).
+        lists (list): ``(path, count)`` for each inlined list. The flat plan
+            can only pack lists that have exactly *count* entries.
+        steps: the struct runs and fallback items, in buffer order.
+        struct: a :class:`struct.Struct` covering the whole form, if every
+            item could be merged into one run; otherwise ``None``.
+    """
+
+    def __init__(self, items, order):
+        self.order = order
+        self.slots = []
+        offset = 0
+        for index, item in enumerate(items):
+            self.slots.append(_Slot(index, item, offset, order))
+            offset += item.size
+        self.size = offset
+
+        self.nodes = []
+        self.lists = []
+        self._leaves = []
+        for slot in self.slots:
+            self._inline(slot, 0, (slot.name,))
+
+        self.steps = []
+        run = []
+        for slot in self._leaves:
+            if slot.is_fixed and run:
+                prefix = _run_prefix(run)
+                if slot.prefix in (None, prefix) or prefix is None:
+                    run.append(slot)
+                    continue
+            if run:
+                self.steps.append(_StructRun(run))
+                run = []
+            if slot.is_fixed:
+                run.append(slot)
+            else:
+                self.steps.append(_ItemStep(slot))
+        if run:
+            self.steps.append(_StructRun(run))
+
+        if len(self.steps) == 1 and isinstance(self.steps[0], _StructRun):
+            self.struct = self.steps[0].struct
+        elif not self.steps:
+            self.struct = struct.Struct('')
+        else:
+            self.struct = None
+
+    def _inline(self, slot, offset, path):
+        inlined = None
+        if slot.has_field:
+            inlined = slot.item._inline_layout(slot.order)
+        start = offset + slot.offset
+
+        if inlined is None:
+            leaf = slot.moved(len(self._leaves), start, path)
+            self._leaves.append(leaf)
+            self.nodes.append((path, 'item', leaf))
+
+        elif isinstance(inlined, Layout):
+            self.nodes.append((path, 'dict', None))
+            for nested in inlined.slots:
+                self._inline(nested, start, path + (nested.name,))
+
+        else:
+            self.nodes.append((path, 'list', None))
+            self.lists.append((path, len(inlined)))
+            for index, layout in enumerate(inlined):
+                entry = path + (index,)
+                self.nodes.append((entry, 'dict', None))
+                for nested in layout.slots:
+                    self._inline(nested, start, entry + (nested.name,))
+                start += layout.size
+
+
 class BinaryFormMeta(wtforms.Form.__class__):
 
     def __new__(cls, name, bases, nmspc):
@@ -214,6 +582,14 @@ class BinaryFormMeta(wtforms.Form.__class__):
         binary_items.sort(key=lambda item: item._creation_id)
         nmspc['_binary_items'] = binary_items
         nmspc['size'] = sum(item.size for item in binary_items)
+        nmspc['_layouts'] = dict((order, Layout(binary_items, order))
+                                 for order in BYTE_ORDERS)
+        nmspc['_codecs'] = {}
+        nmspc['_record_type'] = None
+        nmspc['_view_class'] = None
+        nmspc['_projections'] = {}
+        nmspc['_keeps_buffers'] = any(item._keeps_buffer()
+                                      for item in binary_items)
         return super(BinaryFormMeta, cls).__new__(cls, name, bases, nmspc)
 
 
@@ -257,22 +633,698 @@ class BinaryForm(six.with_metaclass(BinaryFormMeta, wtforms.Form)):
             ValueError: if :paramref:`~unpack.buffer` has the wrong size.
         """
 
+        cls._check_size(buffer)
+        data = cls.codec(order).unpack_from(buffer)
+        return cls(data=data)
+
+    @classmethod
+    def unpack_dict(cls, buffer, order=None):
+        """
+        Unpack a buffer into plain data, without constructing a form.
+
+        None of the wtforms machinery runs, so this is much faster than
+        :meth:`unpack` when only the values are needed. Nested
+        :class:`~minform.BinaryFormField` data is unpacked the same way.
+
+        Parameters:
+            buffer (bytes): bytes object of length :attr:`size`
+            order: see :meth:`unpack`
+
+        Returns:
+            dict: the data stored in the buffer, as :meth:`unpack` would
+            have bound to the form
+
+        Raises:
+            ValueError: if :paramref:`~unpack_dict.buffer` has the wrong
+                size.
+        """
+
+        cls._check_size(buffer)
+        return cls.codec(order).unpack_from(buffer)
+
+    @classmethod
+    def unpack_tuple(cls, buffer, order=None):
+        """
+        Unpack a buffer into a :meth:`record_type` named tuple.
+
+        Like :meth:`unpack_dict`, this skips form construction entirely.
+
+        Parameters:
+            buffer (bytes): bytes object of length :attr:`size`
+            order: see :meth:`unpack`
+
+        Returns:
+            tuple: a :meth:`record_type` instance
+
+        Raises:
+            ValueError: if :paramref:`~unpack_tuple.buffer` has the wrong
+                size.
+        """
+
+        cls._check_size(buffer)
+        values = cls.codec(order).unpack_values_from(buffer)
+        return cls.record_type()._make(values)
+
+    @classmethod
+    def record_type(cls):
+        """
+        Get a :func:`~collections.namedtuple` type for this form's data.
+
+        Its fields are the names of the form's binary fields, in the order
+        that they are packed. The type is created on first use.
+        """
+
+        if cls._record_type is None:
+            with _cache_lock:
+                if cls._record_type is None:
+                    names = [item.name for item in cls._binary_items
+                             if item.form_field is not None]
+                    cls._record_type = collections.namedtuple(cls.__name__,
+                                                              names)
+        return cls._record_type
+
+    @classmethod
+    def view(cls, buffer, offset=0, order=None):
+        """
+        Get a lazy view of the record stored at some offset in a buffer.
+
+        Nothing is decoded up front; each field is decoded the first time
+        it is accessed, so reading a couple of fields from a large record
+        only costs as much as those fields. See
+        :class:`~minform.views.RecordView` for details.
+
+        Parameters:
+            buffer: a byte buffer that contains the serialized data at some
+                offset; the view keeps a reference to it
+            offset (int): the index in *buffer* where the serialized data
+                starts
+            order: see :meth:`unpack`
+
+        Returns:
+            minform.views.RecordView: a view of the record
+
+        Raises:
+            ValueError: if the buffer is too small.
+        """
+
+        start = _checked_offset(buffer, offset, cls.size)
+        if start is None:
+            raise ValueError("{0} bytes is too small for a {1}".format(
+                len(buffer), cls.__name__))
+        return cls._view_at(buffer, start, order)
+
+    @classmethod
+    def _view_at(cls, buffer, offset, order):
+        if cls._view_class is None:
+            with _cache_lock:
+                if cls._view_class is None:
+                    cls._view_class = view_class(cls, cls._layout())
+        return cls._view_class(buffer, offset, order or cls.order or '')
+
+    @classmethod
+    def project(cls, buffer, fields, offset=0, order=None):
+        """
+        Unpack only some of the fields of a record.
+
+        See :class:`~minform.projection.Projection` for the syntax of the
+        field paths; the projection is compiled once per set of paths and
+        cached on the class.
+
+        Parameters:
+            buffer: a byte buffer that contains the serialized data at some
+                offset
+            fields: a list of field paths, such as ``['a', 'b.c', 'd[0:2]']``
+            offset (int): the index in *buffer* where the serialized data
+                starts
+            order: see :meth:`unpack`
+
+        Returns:
+            dict: the selected data, keyed by path
+
+        Raises:
+            ValueError: if the buffer is too small, or a path doesn't match
+                the form.
+        """
+
+        start = _checked_offset(buffer, offset, cls.size)
+        if start is None:
+            raise ValueError("{0} bytes is too small for a {1}".format(
+                len(buffer), cls.__name__))
+        return cls.projection(fields, order).unpack_from(buffer, start)
+
+    @classmethod
+    def projection(cls, fields, order=None):
+        """
+        Compile (or get the cached) :class:`~minform.projection.Projection`
+        of some of this form's fields.
+
+        Parameters:
+            fields: a list of field paths
+            order: see :meth:`unpack`
+        """
+
+        if isinstance(fields, six.string_types):
+            fields = [fields]
+        order = order or cls.order or ''
+        key = (tuple(fields), order)
+        try:
+            return cls._projections[key]
+        except KeyError:
+            with _cache_lock:
+                projection = cls._projections.get(key)
+                if projection is None:
+                    projection = Projection(cls, fields, order)
+                    cls._projections[key] = projection
+                return projection
+
+    @classmethod
+    def numpy_dtype(cls, order=None):
+        """
+        Get a NumPy structured dtype with the same layout as this form.
+
+        Basic fields map to scalar dtypes, :class:`~minform.BytesField` and
+        :class:`~minform.CharField` to ``S<n>`` strings,
+        :class:`~minform.BinaryFormField` to nested structured dtypes, and
+        :data:`~minform.FIXED` :class:`~minform.BinaryFieldList` to
+        subarrays. :data:`~minform.EXPLICIT` fields become a nested
+        ``length`` (or ``count``) and ``data`` (or ``entries``) pair, and
+        :class:`~minform.BlankBytes` are left as padding.
+
+        .. note::
+
+            NumPy trims trailing null bytes from ``S<n>`` values, so
+            :data:`~minform.FIXED` bytes will read as if they were
+            :data:`~minform.AUTOMATIC`.
+
+        This requires NumPy, which is an optional dependency.
+
+        Parameters:
+            order: see :meth:`unpack`
+
+        Returns:
+            numpy.dtype: the structured dtype
+        """
+
+        numpy = _import_numpy()
+        return numpy.dtype(cls._dtype_spec(order))
+
+    @classmethod
+    def _dtype_spec(cls, order=None):
+        layout = cls._layout(order)
+        fields = [slot for slot in layout.slots if slot.has_field]
+        return {
+            'names': [slot.name for slot in fields],
+            'formats': [slot.item._dtype_spec(slot.order) for slot in fields],
+            'offsets': [slot.offset for slot in fields],
+            'itemsize': layout.size,
+        }
+
+    @classmethod
+    def unpack_array(cls, buffer, count=None, offset=0, order=None):
+        """
+        Get a NumPy structured array over back-to-back records in a buffer.
+
+        The array is a zero-copy view of the buffer (made with
+        ``numpy.frombuffer``), with the dtype from :meth:`numpy_dtype`. It is
+        writable if the buffer is.
+
+        This requires NumPy, which is an optional dependency.
+
+        Parameters:
+            buffer: a byte buffer that contains packed records
+            count (int): the number of records. By default, the rest of the
+                buffer must contain a whole number of records.
+            offset (int): the index in *buffer* where the first record
+                starts
+            order: see :meth:`unpack`
+
+        Returns:
+            numpy.ndarray: a one-dimensional structured array
+
+        Raises:
+            ValueError: if the buffer doesn't hold the requested records.
+        """
+
+        numpy = _import_numpy()
+        if offset < 0:
+            offset += len(buffer)
+        count = cls._record_count(buffer, count, offset)
+        return numpy.frombuffer(buffer, dtype=cls.numpy_dtype(order),
+                                count=count, offset=offset)
+
+    @classmethod
+    def unpack_columns(cls, buffer, count=None, offset=0, order=None):
+        """
+        Decode back-to-back records into columns, one per field.
+
+        Numeric fields are decoded into ``array.array`` columns (with the
+        typecode matching the field's struct format), which are filled a
+        whole column at a time and byteswapped in bulk when the byte order
+        isn't native. Other fields, such as :class:`~minform.BytesField`,
+        :class:`~minform.CharField` or nested forms, are decoded into lists.
+        This only needs the standard library.
+
+        Parameters:
+            buffer: a byte buffer that contains packed records
+            count (int): the number of records. By default, the rest of the
+                buffer must contain a whole number of records.
+            offset (int): the index in *buffer* where the first record
+                starts
+            order: see :meth:`unpack`
+
+        Returns:
+            dict: a column of values for each field, keyed by field name
+
+        Raises:
+            ValueError: if the buffer doesn't hold the requested records.
+        """
+
+        if offset < 0:
+            offset += len(buffer)
+        count = cls._record_count(buffer, count, offset)
+        return columnar.unpack_columns(cls._layout(order), buffer, count,
+                                       offset)
+
+    @classmethod
+    def pack_columns(cls, columns, order=None, out=None):
+        """
+        Pack records from columns, one per field.
+
+        This is the inverse of :meth:`unpack_columns`. Each column can be
+        any sequence: a list, an ``array.array``, or a NumPy array. Numeric
+        columns are converted to packed bytes a whole column at a time and
+        scattered into the records, rather than packing one value at a time.
+
+        Parameters:
+            columns (dict): a column of values for each field, keyed by
+                field name. All of the columns must be the same length.
+            order: see :meth:`pack`
+            out: a mutable buffer (e.g. a ``bytearray``) to pack the records
+                into, starting at the beginning of the buffer
+
+        Returns:
+            a new ``bytearray`` that contains the packed records; or, if
+            *out* was given, the number of bytes written to it
+
+        Raises:
+            ValueError: if the columns don't match the form's fields or each
+                other's lengths, or if *out* is too small.
+        """
+
+        layout = cls._layout(order)
+        count = columnar.column_count(layout, columns)
+
+        if out is None:
+            buffer = bytearray(count * layout.size)
+        else:
+            buffer = out
+            if count * layout.size > len(buffer):
+                raise ValueError('{0} bytes is too small for {1} {2} '
+                                 'records'.format(len(buffer), count,
+                                                  cls.__name__))
+
+        columnar.pack_columns(layout, columns, buffer, count)
+
+        if out is None:
+            return buffer
+        return count * layout.size
+
+    @classmethod
+    def iter_unpack(cls, buffer, count=None, offset=0, order=None,
+                    kind='form'):
+        """
+        Lazily unpack back-to-back records from a buffer.
+
+        Parameters:
+            buffer: a byte buffer (e.g. a ``bytes`` object) that contains
+                packed records, one after another
+            count (int): the number of records to unpack. By default, the
+                rest of the buffer must contain a whole number of records.
+            offset (int): the index in *buffer* where the first record
+                starts
+            order: see :meth:`unpack`
+            kind (str): ``'form'`` to yield bound forms (as :meth:`unpack`),
+                ``'dict'`` to yield plain dicts (as :meth:`unpack_dict`), or
+                ``'tuple'`` to yield named tuples (as :meth:`unpack_tuple`)
+
+        Returns:
+            an iterator over the unpacked records
+
+        Raises:
+            ValueError: if the buffer doesn't hold the requested records.
+        """
+
+        if kind not in RECORD_KINDS:
+            raise ValueError('Unknown record kind {0!r}'.format(kind))
+        if offset < 0:
+            offset += len(buffer)
+        count = cls._record_count(buffer, count, offset)
+        codec = cls.codec(order)
+        size = cls.size
+        if size:
+            offsets = six.moves.range(offset, offset + count * size, size)
+        else:
+            offsets = [offset] * count
+
+        if kind == 'tuple':
+            make = cls.record_type()._make
+            if codec.struct is not None and size and _HAS_ITER_UNPACK:
+                view = memoryview(buffer)[offset:offset + count * size]
+                return six.moves.map(make, codec.struct.iter_unpack(view))
+            unpack = codec.unpack_values_from
+            return (make(unpack(buffer, start)) for start in offsets)
+
+        unpack = codec.unpack_from
+        records = (unpack(buffer, start) for start in offsets)
+        if kind == 'form':
+            return (cls(data=data) for data in records)
+        return records
+
+    @classmethod
+    def _decoder(cls, order, kind):
+        # Get a function that unpacks one record of the given kind at an
+        # offset in a buffer.
+        codec = cls.codec(order)
+        if kind == 'dict':
+            return codec.unpack_from
+        elif kind == 'tuple':
+            make = cls.record_type()._make
+            unpack = codec.unpack_values_from
+            return lambda buffer, offset: make(unpack(buffer, offset))
+        elif kind == 'form':
+            unpack = codec.unpack_from
+            return lambda buffer, offset: cls(data=unpack(buffer, offset))
+        raise ValueError('Unknown record kind {0!r}'.format(kind))
+
+    @classmethod
+    def unpack_many(cls, buffer, count=None, offset=0, order=None,
+                    kind='form'):
+        """
+        Unpack back-to-back records from a buffer into a list.
+
+        This takes the same arguments as :meth:`iter_unpack`.
+
+        Returns:
+            list: the unpacked records
+        """
+
+        return list(cls.iter_unpack(buffer, count=count, offset=offset,
+                                    order=order, kind=kind))
+
+    @classmethod
+    def pack_many(cls, records, order=None, out=None):
+        """
+        Pack several records back-to-back into a single buffer.
+
+        Parameters:
+            records: an iterable of dicts of data or :class:`BinaryForm`
+                instances
+            order: see :meth:`pack`
+            out: an optional mutable byte buffer (e.g. a ``bytearray`` or
+                writable ``memoryview``) to write the records into, starting
+                at its first byte
+
+        Returns:
+            a new ``bytearray`` holding the packed records; or, if
+            :paramref:`~pack_many.out` was given, the number of bytes
+            written to it
+
+        Raises:
+            ValueError: if :paramref:`~pack_many.out` is too small to hold
+                the records.
+        """
+
+        pack_into = cls.codec(order).pack_into
+        size = cls.size
+
+        if out is None:
+            if not hasattr(records, '__len__'):
+                records = list(records)
+            buffer = bytearray(len(records) * size)
+        else:
+            buffer = out
+
+        capacity = len(buffer)
+        offset = 0
+        for record in records:
+            if offset + size > capacity:
+                raise ValueError('{0} bytes is too small for the {1} '
+                                 'records'.format(capacity, cls.__name__))
+            if isinstance(record, BinaryForm):
+                record = record.data
+            pack_into(buffer, offset, record)
+            offset += size
+
+        if out is None:
+            return buffer
+        return offset
+
+    @classmethod
+    def read_stream(cls, fileobj, chunk_records=4096, order=None,
+                    kind='form'):
+        """
+        Lazily unpack back-to-back records from a binary file.
+
+        Records are read into a reusable buffer a chunk at a time (with
+        ``readinto``, if the file has it), rather than with one read per
+        record. Records that straddle the end of a chunk are carried over
+        into the next one. (Lazy lists in the records refer to the buffer,
+        so forms that have them get a new buffer for each chunk instead.)
+
+        Parameters:
+            fileobj: a file-like object opened in binary mode
+            chunk_records (int): the number of records to read at a time
+            order: see :meth:`unpack`
+            kind (str): see :meth:`iter_unpack`
+
+        Returns:
+            an iterator over the unpacked records
+
+        Raises:
+            ValueError: if the file ends partway through a record.
+        """
+
+        if kind not in RECORD_KINDS:
+            raise ValueError('Unknown record kind {0!r}'.format(kind))
+        if not cls.size:
+            raise ValueError("Can't read records of {0}, which has no "
+                             "size".format(cls.__name__))
+        return cls._read_stream(fileobj, chunk_records, order, kind)
+
+    @classmethod
+    def _read_stream(cls, fileobj, chunk_records, order, kind):
+        size = cls.size
+        buffer = bytearray(max(chunk_records, 1) * size)
+        view = memoryview(buffer)
+        readinto = getattr(fileobj, 'readinto', None)
+        filled = 0
+
+        while True:
+            if readinto is not None:
+                received = readinto(view[filled:])
+            else:
+                data = fileobj.read(len(buffer) - filled)
+                received = len(data)
+                view[filled:filled + received] = data
+            if not received:
+                break
+            filled += received
+
+            count = filled // size
+            if not count:
+                continue
+            for record in cls.iter_unpack(buffer, count=count, order=order,
+                                          kind=kind):
+                yield record
+
+            # Carry any partial record over to the start of the buffer. If
+            # the records refer to the buffer (through lazy lists), they get
+            # to keep it, and the next chunk is read into a new one.
+            end = count * size
+            if cls._keeps_buffers:
+                buffer = bytearray(len(buffer))
+                buffer[:filled - end] = view[end:filled]
+                view = memoryview(buffer)
+            else:
+                buffer[:filled - end] = buffer[end:filled]
+            filled -= end
+
+        if filled:
+            raise ValueError('Stream ended {0} bytes into a {1} record'.format(
+                filled, cls.__name__))
+
+    @classmethod
+    def write_stream(cls, fileobj, records, chunk_records=4096, order=None):
+        """
+        Pack records back-to-back into a binary file.
+
+        Records are packed into a reusable buffer, which is written out a
+        chunk at a time rather than with one write per record.
+
+        Parameters:
+            fileobj: a file-like object opened in binary mode
+            records: an iterable of dicts of data or :class:`BinaryForm`
+                instances
+            chunk_records (int): the number of records to write at a time
+            order: see :meth:`pack`
+
+        Returns:
+            int: the number of bytes written
+
+        Raises:
+            BlockingIOError: if *fileobj* is a non-blocking raw file that
+                can't take any more data.
+        """
+
+        pack_into = cls.codec(order).pack_into
+        size = cls.size
+        buffer = bytearray(max(chunk_records, 1) * size)
+        view = memoryview(buffer)
+        capacity = len(buffer)
+        offset = 0
+        written = 0
+
+        for record in records:
+            if offset + size > capacity:
+                _write_all(fileobj, view[:offset])
+                written += offset
+                offset = 0
+            if isinstance(record, BinaryForm):
+                record = record.data
+            pack_into(buffer, offset, record)
+            offset += size
+
+        if offset:
+            _write_all(fileobj, view[:offset])
+            written += offset
+        return written
+
+    @classmethod
+    def aiter_stream(cls, reader, chunk_records=4096, order=None,
+                     kind='form'):
+        """
+        Asynchronously unpack back-to-back records from an
+        :class:`asyncio.StreamReader`:
+
+        .. code-block:: python
+
+            async for record in Packet.aiter_stream(reader):
+                ...
+
+        Whatever data has already arrived (up to *chunk_records* records) is
+        read and unpacked at once, so there's one ``await`` per batch of
+        records rather than per record; only the remainder of a record that
+        straddles two reads is waited for with ``readexactly``.
+
+        Parameters:
+            reader: an :class:`asyncio.StreamReader`
+            chunk_records (int): the most records to read at a time
+            order: see :meth:`unpack`
+            kind (str): see :meth:`iter_unpack`
+
+        Returns:
+            an asynchronous iterator over the unpacked records
+
+        Raises:
+            ValueError: if the stream ends partway through a record.
+        """
+
+        if kind not in RECORD_KINDS:
+            raise ValueError('Unknown record kind {0!r}'.format(kind))
+        if not cls.size:
+            raise ValueError("Can't read records of {0}, which has no "
+                             "size".format(cls.__name__))
+        from . import aio
+        return aio.iter_stream(cls, reader, chunk_records, order, kind)
+
+    @classmethod
+    def awrite(cls, writer, records, chunk_records=4096, order=None):
+        """
+        Pack records back-to-back into an :class:`asyncio.StreamWriter`:
+
+        .. code-block:: python
+
+            await Packet.awrite(writer, records)
+
+        Records are packed and written a chunk at a time, and the writer is
+        drained after each chunk, so that a slow peer applies backpressure.
+
+        Parameters:
+            writer: an :class:`asyncio.StreamWriter`
+            records: an iterable of dicts of data or :class:`BinaryForm`
+                instances
+            chunk_records (int): the number of records to write at a time
+            order: see :meth:`pack`
+
+        Returns:
+            a coroutine that returns the number of bytes written
+        """
+
+        from . import aio
+        return aio.write(cls, writer, records, chunk_records, order)
+
+    @classmethod
+    def _record_count(cls, buffer, count, offset):
+        available = len(buffer) - offset
+        if count is None:
+            if not cls.size:
+                raise ValueError("Can't count records of {0}, which has no "
+                                 "size".format(cls.__name__))
+            count, extra = divmod(available, cls.size)
+            if extra:
+                raise ValueError('{0} bytes is not a whole number of {1} '
+                                 'records'.format(available, cls.__name__))
+        elif count < 0 or count * cls.size > available:
+            raise ValueError('{0} bytes is too small for {1} {2} '
+                             'records'.format(available, count, cls.__name__))
+        return count
+
+    @classmethod
+    def _check_size(cls, buffer):
         if len(buffer) != cls.size:
             raise ValueError('Recieved {0} bytes; expected {1}'.format(
                 len(buffer), cls.size))
-        order = order or cls.order or ''
-        data = {}
-        start = 0
 
-        for item in cls._binary_items:
-            stop = start + item.size
-            if item.form_field is not None:
-                data[item.name] = item.unpack(buffer[start:stop], order=order)
-            else:
-                item.unpack(buffer[start:stop])
-            start = stop
+    @classmethod
+    def codec(cls, order=None):
+        """
+        Get the generated pack/unpack functions for this form.
 
-        return cls(data=data)
+        The :class:`~minform.codec.Codec` is generated the first time the
+        form is used with a byte order, and cached on the class afterwards.
+        Its :attr:`~minform.codec.Codec.source` attribute shows the generated
+        code.
+
+        Parameters:
+            order: :ref:`byte order <byte-order>` constant. *If*
+                :attr:`order` *is set, this parameter will be ignored.*
+
+        Returns:
+            minform.codec.Codec: the codec for the resolved byte order
+        """
+
+        order = order or cls.order or ''
+        try:
+            return cls._codecs[order]
+        except KeyError:
+            with _cache_lock:
+                codec = cls._codecs.get(order)
+                if codec is None:
+                    codec = cls._codecs[order] = Codec(cls, cls._layout(order))
+                return codec
+
+    @classmethod
+    def _layout(cls, order=None):
+        order = order or cls.order or ''
+        try:
+            return cls._layouts[order]
+        except KeyError:
+            with _cache_lock:
+                layout = cls._layouts.get(order)
+                if layout is None:
+                    layout = Layout(cls._binary_items, order)
+                    cls._layouts[order] = layout
+                return layout
 
     def pack(self, order=None):
         """
@@ -287,44 +1339,65 @@ class BinaryForm(six.with_metaclass(BinaryFormMeta, wtforms.Form)):
             bytes: bytes object with length :attr:`self.size <size>`
         """
 
-        order = order or self.order or ''
-
-        size = sum(item.size for item in self._binary_items)
-        buffer = bytearray(size)
-        start = 0
-
-        for item in self._binary_items:
-            stop = start + item.size
-            if item.form_field is not None:
-                value = self.data[item.name]
-                buffer[start:stop] = item.pack(value, order=order)
-            else:
-                buffer[start:stop] = item.pack(None)
-            start = stop
-
-        return bytes(buffer)
+        return self.codec(order).pack(self.data)
 
     def pack_into(self, buffer, offset, order=None):
         """
         Pack data from this item into an existing buffer.
 
         Parameters:
-            buffer: a mutable byte buffer (e.g. ``bytearray``), into which the
-                data will be written
+            buffer: a mutable byte buffer (e.g. ``bytearray``, a writable
+                ``memoryview`` or ``mmap``), into which the data will be
+                written directly
             offset (int): the starting index of *buffer* to write data to
             data: see :meth:`pack`
             order: see :meth:`pack`
         """
 
-        if offset == -self.size:
-            stop_index = None
-        else:
-            stop_index = offset + self.size
-
-        if len(buffer[offset:stop_index]) < self.size:
+        data = self.data
+        start = _checked_offset(buffer, offset, self.size)
+        if start is None:
             raise ValueError("Need at least {0} bytes to pack {1}".format(
-                self.size, self.data))
-        buffer[offset:stop_index] = self.pack(order=order)
+                self.size, data))
+        self.codec(order).pack_into(buffer, start, data)
+
+    def __reduce__(self):
+        # Pickle forms compactly, as their class and packed data, rather than
+        # as the whole wtforms object graph. That's only done when unpacking
+        # gives back exactly the same data, so forms with plain wtforms
+        # fields, and data that can't be packed (e.g. because it hasn't been
+        # validated) or wouldn't survive packing (e.g. Float32 values that
+        # would lose precision), are pickled as a dict instead.
+        cls = type(self)
+        data = self.data
+        fields = sum(1 for item in cls._binary_items
+                     if item.form_field is not None)
+        if len(data) == fields:
+            try:
+                buffer = bytes(self.pack())
+            except (struct.error, ValueError, TypeError):
+                pass
+            else:
+                if cls.unpack_dict(buffer) == data:
+                    return _unpickle_packed, (cls, buffer)
+        return _unpickle_data, (cls, data)
+
+    # copy uses __reduce_ex__ too, but copies should keep the whole form
+    # (prefix, meta, errors, etc.), not just its data.
+
+    def __copy__(self):
+        cls = type(self)
+        clone = cls.__new__(cls)
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    def __deepcopy__(self, memo):
+        cls = type(self)
+        clone = cls.__new__(cls)
+        memo[id(self)] = clone
+        _deepcopy_fields(self._fields.values(), memo)
+        clone.__dict__.update(copy.deepcopy(self.__dict__, memo))
+        return clone
 
     @classmethod
     def unpack_from(cls, buffer, offset=0, order=None):
@@ -332,19 +1405,17 @@ class BinaryForm(six.with_metaclass(BinaryFormMeta, wtforms.Form)):
         Unpack data from a specific portion of a buffer.
 
         Parameters:
-            buffer: a byte buffer (e.g. a ``bytes`` object) that contains the
-                serialized data at some offset
+            buffer: any byte buffer (e.g. ``bytes``, ``bytearray``,
+                ``memoryview`` or ``mmap``) that contains the serialized data
+                at some offset. The data is decoded in place, without copying
+                the buffer.
             offset (int): the index in *buffer* where the serialized data
                 starts
             order: see :meth:`unpack`
         """
 
-        if offset == -cls.size:
-            stop_index = None
-        else:
-            stop_index = offset + cls.size
-
-        if len(buffer[offset:stop_index]) < cls.size:
-            raise ValueError("{0} is too small for a {1}".format(
-                len(buffer[offset:stop_index]), cls.__name__))
-        return cls.unpack(buffer[offset:stop_index], order=order)
+        start = _checked_offset(buffer, offset, cls.size)
+        if start is None:
+            raise ValueError("{0} bytes is too small for a {1}".format(
+                len(buffer), cls.__name__))
+        return cls(data=cls.codec(order).unpack_from(buffer, start))
@@ -0,0 +1,345 @@
+import io
+import mmap
+import os
+import time
+
+import six
+
+from .core import BinaryForm, _write_all
+
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class RecordFile(object):
+
+    """
+    File of back-to-back records, memory-mapped for random access.
+
+    Because every record of a :class:`~minform.BinaryForm` has the same
+    :attr:`~minform.BinaryForm.size`, record *i* is always at byte
+    ``i * size``, so indexing is constant-time and only touches the pages
+    that hold that record:
+
+    .. code-block:: python
+
+        with minform.RecordFile('trades.bin', Trade) as trades:
+            print(len(trades), trades[-1].price.data)
+            for trade in trades[1000:2000]:
+                ...
+
+    In ``'r+'`` mode, records can be replaced in place
+    (``trades[i] = data``), and :meth:`view` returns writable views. In
+    ``'a'`` mode, records can be added to the end of the file with
+    :meth:`append` and :meth:`extend`, and all records can still be read.
+
+    Parameters:
+        path: the path of the file
+        form_class: the :class:`~minform.BinaryForm` subclass of the
+            records
+        mode (str): ``'r'`` to read, ``'r+'`` to read and update records in
+            place, or ``'a'`` to read and append records. The file must
+            already exist for ``'r'`` and ``'r+'``.
+        order: see :meth:`BinaryForm.unpack <minform.BinaryForm.unpack>`
+        kind (str): how to return records; see :meth:`BinaryForm.iter_unpack
+            <minform.BinaryForm.iter_unpack>`
+
+    Raises:
+        ValueError: if the file doesn't hold a whole number of records.
+    """
+
+    _modes = {
+        'r': ('rb', mmap.ACCESS_READ),
+        'r+': ('r+b', mmap.ACCESS_WRITE),
+        'a': ('a+b', mmap.ACCESS_READ),
+    }
+
+    def __init__(self, path, form_class, mode='r', order=None, kind='form'):
+        if mode not in self._modes:
+            raise ValueError('Unknown mode {0!r}'.format(mode))
+        if not form_class.size:
+            raise ValueError("Can't store records of {0}, which have no "
+                             "size".format(form_class.__name__))
+
+        self.path = path
+        self.form_class = form_class
+        self.mode = mode
+        self.order = order
+        self._decode = form_class._decoder(order, kind)
+        self._codec = form_class.codec(order)
+        self._size = form_class.size
+
+        file_mode, self._access = self._modes[mode]
+        self._file = open(path, file_mode)
+        self._map = None
+        self._stale = True
+        try:
+            self._mapping()
+        except Exception:
+            self._file.close()
+            raise
+
+    def _mapping(self):
+        # Get the current memory map of the file (None if it's empty),
+        # remapping it if records have been appended.
+        if self._stale:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.flush()
+            length = os.fstat(self._file.fileno()).st_size
+            if length % self._size:
+                raise ValueError('{0} bytes is not a whole number of {1} '
+                                 'records'.format(length,
+                                                  self.form_class.__name__))
+            if length:
+                self._map = mmap.mmap(self._file.fileno(), length,
+                                      access=self._access)
+            self._stale = False
+        return self._map
+
+    def __len__(self):
+        mapping = self._mapping()
+        if mapping is None:
+            return 0
+        return len(mapping) // self._size
+
+    def _offset(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('RecordFile index out of range')
+        return index * self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indices = six.moves.range(*index.indices(len(self)))
+            return [self._decode(self._map, i * self._size) for i in indices]
+        offset = self._offset(index)
+        return self._decode(self._map, offset)
+
+    def __setitem__(self, index, record):
+        if self.mode != 'r+':
+            raise TypeError("Records can only be replaced in 'r+' mode")
+        offset = self._offset(index)
+        if isinstance(record, BinaryForm):
+            record = record.data
+        self._codec.pack_into(self._map, offset, record)
+
+    def __iter__(self):
+        mapping = self._mapping()
+        if mapping is None:
+            return
+        advise = getattr(mapping, 'madvise', None)
+        if advise is not None:
+            # Ask the kernel to read ahead, and drop pages behind us.
+            advise(mmap.MADV_SEQUENTIAL)
+        try:
+            decode = self._decode
+            for offset in six.moves.range(0, len(mapping), self._size):
+                yield decode(mapping, offset)
+        finally:
+            # Go back to the usual paging for random access, unless the
+            # file has been closed (or remapped) in the meantime.
+            if advise is not None and mapping is self._map:
+                advise(mmap.MADV_NORMAL)
+
+    def view(self, index):
+        """
+        Get a lazy :class:`~minform.views.RecordView` of a record, straight
+        from the mapped file. In ``'r+'`` mode, the view is writable. In
+        ``'a'`` mode, the view can't be used after more records have been
+        appended, since the file is then mapped again.
+        """
+        offset = self._offset(index)
+        return self.form_class._view_at(self._map, offset, self.order)
+
+    def append(self, record):
+        """
+        Add a record to the end of the file (in ``'a'`` mode).
+        """
+        self.extend([record])
+
+    def extend(self, records):
+        """
+        Add records to the end of the file (in ``'a'`` mode).
+        """
+        if self.mode != 'a':
+            raise TypeError("Records can only be appended in 'a' mode")
+        self._file.write(self.form_class.pack_many(records,
+                                                   order=self.order))
+        self._stale = True
+
+    def flush(self):
+        """
+        Write any changes to disk.
+        """
+        if self._map is not None and self._access == mmap.ACCESS_WRITE:
+            self._map.flush()
+        self._file.flush()
+
+    def close(self):
+        """
+        Flush and close the file.
+        """
+        if self._file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<RecordFile {0!r} of {1} ({2!r})>'.format(
+            self.path, self.form_class.__name__, self.mode)
+
+
+class RecordLog(object):
+
+    """
+    Append-only log of records, for durable ingestion.
+
+    Records are packed into a large in-memory buffer, which is written to
+    the file with a single ``write`` when it fills up (or on :meth:`flush`).
+    Written records are made durable with ``fsync`` according to a policy:
+    after a number of records, after an amount of time, or both, so that
+    the cost of each ``fsync`` is shared by many records.
+
+    .. code-block:: python
+
+        with minform.RecordLog('events.log', Event, sync_records=10000,
+                               sync_interval=0.5) as log:
+            for event in incoming():
+                log.append(event)
+
+    If the process crashes partway through writing a record, the file will
+    end with a partial record. When the log is opened again, that partial
+    record is truncated away, so the file always holds whole records (and
+    can be read with :meth:`BinaryForm.read_stream
+    <minform.BinaryForm.read_stream>` or :class:`RecordFile`).
+
+    Parameters:
+        path: the path of the log file, which is created if needed
+        form_class: the :class:`~minform.BinaryForm` subclass of the
+            records
+        buffer_records (int): the number of records to buffer between writes
+        sync_records (int): ``fsync`` once at least this many records have
+            been appended since the last ``fsync``; ``None`` to not sync by
+            record count
+        sync_interval (float): ``fsync`` when a record is appended at least
+            this many seconds after the last ``fsync``; ``None`` to not sync
+            by time
+        order: see :meth:`BinaryForm.pack <minform.BinaryForm.pack>`
+
+    Attributes:
+        truncated (int): the number of bytes of partial record that were
+            removed from the end of the file when it was opened.
+    """
+
+    def __init__(self, path, form_class, buffer_records=4096,
+                 sync_records=None, sync_interval=1.0, order=None):
+        if not form_class.size:
+            raise ValueError("Can't store records of {0}, which have no "
+                             "size".format(form_class.__name__))
+
+        self.path = path
+        self.form_class = form_class
+        self.sync_records = sync_records
+        self.sync_interval = sync_interval
+        self._pack_into = form_class.codec(order).pack_into
+        self._size = form_class.size
+
+        self._buffer = bytearray(max(buffer_records, 1) * self._size)
+        self._view = memoryview(self._buffer)
+        self._offset = 0
+
+        self._file = io.open(path, 'ab', buffering=0)
+        try:
+            length = os.fstat(self._file.fileno()).st_size
+            self.truncated = length % self._size
+            if self.truncated:
+                os.ftruncate(self._file.fileno(), length - self.truncated)
+                os.fsync(self._file.fileno())
+        except Exception:
+            self._file.close()
+            raise
+
+        self._unsynced = 0
+        self._last_sync = _clock()
+
+    def append(self, record):
+        """
+        Add a record to the log.
+
+        Parameters:
+            record: a dict of data or a :class:`~minform.BinaryForm`
+                instance
+        """
+        if self._offset + self._size > len(self._buffer):
+            self.flush()
+        if isinstance(record, BinaryForm):
+            record = record.data
+        self._pack_into(self._buffer, self._offset, record)
+        self._offset += self._size
+        self._unsynced += 1
+
+        if self.sync_records is not None and (
+                self._unsynced >= self.sync_records):
+            self.sync()
+        elif self.sync_interval is not None and (
+                _clock() - self._last_sync >= self.sync_interval):
+            self.sync()
+
+    def extend(self, records):
+        """
+        Add several records to the log.
+        """
+        for record in records:
+            self.append(record)
+
+    def flush(self):
+        """
+        Write any buffered records to the file, without syncing it.
+        """
+        if self._offset:
+            _write_all(self._file, self._view[:self._offset])
+            self._offset = 0
+
+    def sync(self):
+        """
+        Write any buffered records, and ``fsync`` the file.
+        """
+        self.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = _clock()
+
+    def close(self):
+        """
+        Sync and close the log.
+        """
+        if self._file.closed:
+            return
+        try:
+            self.sync()
+        finally:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<RecordLog {0!r} of {1}>'.format(self.path,
+                                                 self.form_class.__name__)
@@ -0,0 +1,123 @@
+import mmap
+import os
+
+import six
+
+
+def unpack_file(path, form_class, workers=None, mapper=None, reducer=None,
+                order=None, kind='dict'):
+    """
+    Unpack a file of back-to-back records using several processes.
+
+    The file is split into record-aligned ranges (which is simple, since
+    every record is :attr:`~minform.BinaryForm.size` bytes long), and each
+    range is handed to a :class:`concurrent.futures.ProcessPoolExecutor`
+    worker, which memory-maps the file itself. Only the results are sent
+    back to this process, never the raw bytes:
+
+    .. code-block:: python
+
+        import operator
+        import minform.parallel
+
+        total = minform.parallel.unpack_file(
+            'trades.bin', Trade, workers=8,
+            mapper=operator.itemgetter('volume'), reducer=operator.add)
+
+    Since the work is done in other processes, *form_class*, *mapper* and
+    *reducer* must all be picklable (e.g. defined at the top level of a
+    module), as must whatever they return.
+
+    Parameters:
+        path: the path of the file
+        form_class: the :class:`~minform.BinaryForm` subclass of the
+            records
+        workers (int): the number of processes; by default, one per CPU
+        mapper: a function that is called with each unpacked record, in a
+            worker process; its return value is used instead of the record
+        reducer: a function that combines two (mapped) records into one,
+            like the function passed to :func:`functools.reduce`. Each
+            worker reduces its own range, and the results from the workers
+            are then reduced in this process, so the function should be
+            associative.
+        order: see :meth:`BinaryForm.unpack <minform.BinaryForm.unpack>`
+        kind (str): see :meth:`BinaryForm.iter_unpack
+            <minform.BinaryForm.iter_unpack>`
+
+    Returns:
+        the reduced result, if *reducer* was given (or ``None`` if the file
+        has no records); otherwise, a list of the (mapped) records, in file
+        order
+
+    Raises:
+        ValueError: if the file doesn't hold a whole number of records.
+    """
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    size = form_class.size
+    if not size:
+        raise ValueError("Can't read records of {0}, which have no "
+                         "size".format(form_class.__name__))
+    length = os.path.getsize(path)
+    count, extra = divmod(length, size)
+    if extra:
+        raise ValueError('{0} bytes is not a whole number of {1} '
+                         'records'.format(length, form_class.__name__))
+
+    if not count:
+        return None if reducer is not None else []
+
+    workers = workers or os.cpu_count() or 1
+    tasks = [(path, form_class, start, stop, order, kind, mapper, reducer)
+             for start, stop in _ranges(count, workers * 4)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_unpack_range, *zip(*tasks)))
+
+    if reducer is None:
+        return [record for result in results for record in result]
+    return six.moves.reduce(reducer, results)
+
+
+def _ranges(count, parts):
+    # Split count records into at most parts (start, stop) ranges of nearly
+    # equal length.
+    parts = max(min(parts, count), 1)
+    step, extra = divmod(count, parts)
+    start = 0
+    for part in six.moves.range(parts):
+        stop = start + step + (1 if part < extra else 0)
+        if stop > start:
+            yield start, stop
+        start = stop
+
+
+def _unpack_range(path, form_class, start, stop, order, kind, mapper,
+                  reducer):
+    # Runs in a worker process: map just this range of the file, and unpack
+    # (and map and reduce) its records.
+    size = form_class.size
+    begin = start * size
+    # Mappings have to start on an allocation boundary.
+    base = begin - begin % mmap.ALLOCATIONGRANULARITY
+
+    with open(path, 'rb') as f:
+        mapping = mmap.mmap(f.fileno(), stop * size - base,
+                            access=mmap.ACCESS_READ, offset=base)
+    if hasattr(mapping, 'madvise'):
+        mapping.madvise(mmap.MADV_SEQUENTIAL)
+    result = _process(form_class.iter_unpack(
+        mapping, count=stop - start, offset=begin - base, order=order,
+        kind=kind), mapper, reducer)
+    mapping.close()
+    return result
+
+
+def _process(records, mapper, reducer):
+    # Kept separate so that nothing refers to the mapping once it returns.
+    if mapper is not None:
+        records = six.moves.map(mapper, records)
+    if reducer is not None:
+        return six.moves.reduce(reducer, records)
+    return list(records)
@@ -0,0 +1,175 @@
+import six
+
+
+class Parser(object):
+
+    """
+    Incremental, I/O-free parser for a stream of packed records.
+
+    Feed the parser bytes as they arrive, from whatever source (a socket,
+    a pipe, a thread, or any event loop), and it returns the records that
+    are complete so far:
+
+    .. code-block:: python
+
+        parser = minform.Parser(Packet)
+        while True:
+            for packet in parser.feed(sock.recv(65536)):
+                handle(packet)
+
+    Any partial record at the end of the data is kept in a reusable buffer
+    until the rest of it arrives. Records are unpacked in place, by offset,
+    so data is never re-sliced; when nothing is pending, records are even
+    unpacked straight out of the data that was fed. (Lazy lists refer to
+    the buffer they were unpacked from, so records of forms that have them
+    are unpacked from a copy of the data instead.)
+
+    If the stream mixes several kinds of record, each preceded by a type
+    code, pass a dict that maps type codes to form classes, along with the
+    field that stores the type code. :meth:`feed` then returns ``(type,
+    record)`` pairs:
+
+    .. code-block:: python
+
+        parser = minform.Parser({1: Login, 2: Data, 3: Logout},
+                                prefix=minform.UInt8Field())
+
+    Parameters:
+        forms: a :class:`~minform.BinaryForm` subclass, or a dict that maps
+            type codes to :class:`~minform.BinaryForm` subclasses
+        prefix: a :class:`~minform.BinaryItem` that stores each record's
+            type code, just before the record. Required if *forms* is a
+            dict.
+        order: see :meth:`BinaryForm.unpack <minform.BinaryForm.unpack>`.
+            It also applies to *prefix*.
+        kind (str): see :meth:`BinaryForm.iter_unpack
+            <minform.BinaryForm.iter_unpack>`
+
+    Raises:
+        ValueError: if the arguments don't make sense together.
+    """
+
+    def __init__(self, forms, prefix=None, order=None, kind='form'):
+        if isinstance(forms, dict):
+            if prefix is None:
+                raise ValueError('A type prefix is needed to choose between '
+                                 'forms')
+            self._decoders = dict(
+                (code, (form_class.size, form_class._decoder(order, kind)))
+                for code, form_class in forms.items())
+            self._keeps_buffers = any(form_class._keeps_buffers
+                                      for form_class in forms.values())
+        else:
+            if prefix is not None:
+                raise ValueError('A type prefix needs a dict of forms')
+            if not forms.size:
+                raise ValueError("Can't parse records of {0}, which has no "
+                                 "size".format(forms.__name__))
+            self._decode = forms._decoder(order, kind)
+            self._size = forms.size
+            self._keeps_buffers = forms._keeps_buffers
+
+        self.prefix = prefix
+        self.order = order
+        self._buffer = bytearray()
+
+        # The unparsed bytes are self._buffer[self._start:self._end].
+        self._start = 0
+        self._end = 0
+
+    @property
+    def pending(self):
+        """
+        The number of bytes of incomplete record that are buffered.
+        """
+        return self._end - self._start
+
+    def feed(self, data):
+        """
+        Add data to the stream.
+
+        Parameters:
+            data: a bytes-like object with the next bytes of the stream
+
+        Returns:
+            list: the records that were completed by *data*, in order
+
+        Raises:
+            ValueError: for a type prefix that doesn't match any form. The
+                parser can't find the next record after that, so it
+                shouldn't be used again.
+        """
+
+        records = []
+        if self._start == self._end:
+            # Nothing is pending, so parse straight from the new data, and
+            # only keep the leftovers.
+            if self._keeps_buffers:
+                data = bytes(data)
+            used = self._parse(data, 0, len(data), records)
+            self._start = 0
+            self._end = 0
+            self._append(memoryview(data)[used:])
+        else:
+            self._append(data)
+            if self._keeps_buffers:
+                pending = bytes(self._buffer[self._start:self._end])
+                self._start += self._parse(pending, 0, len(pending), records)
+            else:
+                self._start = self._parse(self._buffer, self._start,
+                                          self._end, records)
+        return records
+
+    def close(self):
+        """
+        Signal the end of the stream.
+
+        Raises:
+            ValueError: if the stream ended partway through a record.
+        """
+        if self._start != self._end:
+            raise ValueError('Stream ended with {0} bytes of an incomplete '
+                             'record'.format(self._end - self._start))
+
+    def _append(self, data):
+        size = len(data)
+        if not size:
+            return
+        if self._end + size > len(self._buffer):
+            # Move the pending bytes to the front, and grow if they still
+            # won't fit.
+            pending = self._end - self._start
+            self._buffer[:pending] = self._buffer[self._start:self._end]
+            self._start = 0
+            self._end = pending
+            if pending + size > len(self._buffer):
+                self._buffer.extend(
+                    bytearray(pending + size - len(self._buffer)))
+        self._buffer[self._end:self._end + size] = data
+        self._end += size
+
+    def _parse(self, buffer, start, end, records):
+        # Decode complete records from buffer[start:end] into records;
+        # return the offset of the first byte that wasn't used.
+        if self.prefix is None:
+            decode = self._decode
+            size = self._size
+            append = records.append
+            for offset in six.moves.range(start, end - size + 1, size):
+                append(decode(buffer, offset))
+            return start + (end - start) // size * size
+
+        prefix = self.prefix
+        order = self.order
+        while end - start >= prefix.size:
+            code = prefix._unpack_from(buffer, start, order)
+            try:
+                size, decode = self._decoders[code]
+            except KeyError:
+                raise ValueError('Unknown record type {0!r}'.format(code))
+            offset = start + prefix.size
+            if end - offset < size:
+                break
+            records.append((code, decode(buffer, offset)))
+            start = offset + size
+        return start
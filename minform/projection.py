@@ -0,0 +1,184 @@
+import re
+import six
+
+
+_NAME = re.compile(r'\.?([A-Za-z_]\w*)')
+_INDEX = re.compile(r'\[(-?\d+)\]')
+_SLICE = re.compile(r'\[(-?\d*):(-?\d*)(?::(-?\d*))?\]')
+
+
+class Projection(object):
+
+    """
+    Compiled selection of a few fields from a :class:`~minform.BinaryForm`.
+
+    Each field is named by a path: a field name, optionally followed by
+    ``.name`` to select a field of a nested :class:`~minform.BinaryFormField`,
+    ``[i]`` to select one entry of a :class:`~minform.BinaryFieldList`, or
+    ``[i:j]`` (or ``[i:j:k]``) to select a range of entries. For example:
+
+    .. code-block:: python
+
+        projection = Packet.projection(['timestamp', 'header.route',
+                                        'samples[0:4]', 'hops[-1].address'])
+        projection.unpack_from(buffer, offset)
+        # {'timestamp': ..., 'header.route': ..., 'samples[0:4]': [...],
+        #  'hops[-1].address': ...}
+
+    Offsets are resolved when the projection is compiled, so unpacking jumps
+    straight to the selected bytes and skips everything else. Only the
+    count prefixes of :data:`~minform.EXPLICIT` lists are read at unpack
+    time, when a path indexes into them.
+
+    Attributes:
+        form_class: The :class:`~minform.BinaryForm` subclass.
+        order: The byte order that the projection was compiled for.
+        fields (tuple): The selected paths.
+    """
+
+    def __init__(self, form_class, fields, order):
+        self.form_class = form_class
+        self.order = order
+        self.fields = tuple(fields)
+        self._getters = [(path, _compile_form(form_class, order,
+                                              _parse(path)))
+                         for path in self.fields]
+
+    def unpack_from(self, buffer, offset=0):
+        """
+        Unpack the selected fields from a record in a buffer.
+
+        The buffer isn't bounds-checked; see :meth:`BinaryForm.project
+        <minform.BinaryForm.project>` for a checked version.
+
+        Returns:
+            dict: the selected data, keyed by path
+        """
+        return dict((path, get(buffer, offset))
+                    for path, get in self._getters)
+
+    def __repr__(self):
+        return '<Projection {0} {1!r}>'.format(self.form_class.__name__,
+                                               list(self.fields))
+
+
+def _parse(path):
+    match = _NAME.match(path)
+    if match is None or path.startswith('.'):
+        raise ValueError('Invalid field path {0!r}'.format(path))
+
+    steps = [('field', match.group(1))]
+    position = match.end()
+
+    while position < len(path):
+        match = _NAME.match(path, position)
+        if match is not None and path[position] == '.':
+            steps.append(('field', match.group(1)))
+            position = match.end()
+            continue
+
+        match = _INDEX.match(path, position)
+        if match is not None:
+            steps.append(('index', int(match.group(1))))
+            position = match.end()
+            continue
+
+        match = _SLICE.match(path, position)
+        if match is not None:
+            bounds = [int(group) if group else None
+                      for group in match.groups()]
+            steps.append(('slice', slice(*bounds)))
+            position = match.end()
+            continue
+
+        raise ValueError('Invalid field path {0!r}'.format(path))
+
+    return steps
+
+
+def _compile_form(form_class, order, steps):
+    # Compile a getter for a path within a form, given the (unresolved)
+    # order that the form's container would pass in.
+    order = order or form_class.order or ''
+    if not steps:
+        return form_class.codec(order).unpack_from
+
+    kind, name = steps[0]
+    if kind != 'field':
+        raise ValueError("Can't index {0}".format(form_class.__name__))
+
+    for slot in form_class._layout(order).slots:
+        if slot.has_field and slot.name == name:
+            break
+    else:
+        raise ValueError('{0} has no field {1!r}'.format(
+            form_class.__name__, name))
+
+    return _shifted(_compile_item(slot.item, order, steps[1:]), slot.offset)
+
+
+def _compile_item(item, order, steps):
+    if not steps:
+        unpack_from = item._unpack_from
+        return lambda buffer, offset: unpack_from(buffer, offset, order)
+
+    kind, arg = steps[0]
+
+    if kind == 'field':
+        form_class = getattr(item, 'form_class', None)
+        if form_class is None:
+            raise ValueError('{0} is not a form field'.format(item.name))
+        return _compile_form(form_class, order or item.order, steps)
+
+    inner_field = getattr(item, 'inner_field', None)
+    if inner_field is None:
+        raise ValueError('{0} is not a list field'.format(item.name))
+
+    get = _compile_item(inner_field, order or item.order, steps[1:])
+    prefix_size = item.prefix_size
+    step = inner_field.size
+    count_from = item._count_from
+    # Only EXPLICIT lists have a count prefix; any other list always holds
+    # max_entries entries, so its offsets are entirely static.
+    fixed = not prefix_size
+
+    if kind == 'index':
+        if fixed:
+            index = _fixed_index(arg, item.max_entries, item.name)
+            return _shifted(get, prefix_size + index * step)
+
+        def get_entry(buffer, offset):
+            count = count_from(buffer, offset)
+            index = arg + count if arg < 0 else arg
+            if not 0 <= index < count:
+                raise IndexError('{0} has no entry {1}'.format(item.name,
+                                                               arg))
+            return get(buffer, offset + prefix_size + index * step)
+        return get_entry
+
+    if fixed:
+        indices = six.moves.range(*arg.indices(item.max_entries))
+        offsets = [prefix_size + index * step for index in indices]
+        return lambda buffer, offset: [get(buffer, offset + delta)
+                                       for delta in offsets]
+
+    def get_entries(buffer, offset):
+        count = count_from(buffer, offset)
+        start = offset + prefix_size
+        return [get(buffer, start + index * step)
+                for index in six.moves.range(*arg.indices(count))]
+    return get_entries
+
+
+def _fixed_index(index, count, name):
+    if index < 0:
+        index += count
+    if not 0 <= index < count:
+        raise ValueError('{0} has no entry {1}'.format(name, index))
+    return index
+
+
+def _shifted(get, delta):
+    if not delta:
+        return get
+    return lambda buffer, offset: get(buffer, offset + delta)
@@ -0,0 +1,293 @@
+import struct
+import sys
+
+import six
+
+from .core import BinaryForm
+
+
+# The ring indices are 8-byte counters at the start of the shared memory,
+# on separate cache lines so that the producer and consumer don't contend.
+_INDEX = struct.Struct('Q')
+_WRITE_INDEX = 0
+_READ_INDEX = 64
+_HEADER_SIZE = 128
+
+
+class SharedTable(object):
+
+    """
+    Table of records in shared memory, for passing records between
+    processes without pickling them.
+
+    Records are packed straight into a :mod:`multiprocessing.shared_memory`
+    block, at a fixed offset per slot, and unpacked (or viewed) straight
+    out of it:
+
+    .. code-block:: python
+
+        table = minform.SharedTable(Quote, 1024)
+        worker = multiprocessing.Process(target=consume, args=(table,))
+        worker.start()
+        table[0] = {'symbol': b'ABC', 'price': 101.25}
+
+    A table can be passed to other processes as an argument (it pickles as
+    the name of its shared memory block), or attached to by name with
+    ``SharedTable(Quote, 1024, name=name, create=False)``. Before Python
+    3.13, attaching by name from a process that wasn't started by
+    :mod:`multiprocessing` from the creator registers the block with that
+    process's own resource tracker, which unlinks it when the process
+    exits; in that case, make sure the attaching process outlives any use of
+    the table. (From Python 3.13, attached blocks aren't tracked at all.)
+
+    Besides indexing slots directly, the table can be used as a queue
+    between exactly one producer process, which calls :meth:`put`, and one
+    consumer process, which calls :meth:`get`. The read and write positions
+    are counters in the shared memory, and each is only ever written by one
+    side. By default, the queue is lock-free: the producer packs a record
+    and then publishes it by bumping the write position. That relies on
+    aligned 8-byte writes being atomic, and on other processes seeing
+    writes in the order they were made, as on x86 and x86-64. On CPUs that
+    may reorder writes (e.g. ARM), pass a *lock* (such as a
+    :class:`multiprocessing.Lock`), which :meth:`put` and :meth:`get` hold
+    while they use the queue, so that a record is never read half-written.
+
+    Parameters:
+        form_class: the :class:`~minform.BinaryForm` subclass of the
+            records
+        capacity (int): the number of record slots
+        name (str): the name of the shared memory block. By default, a
+            unique name is chosen when the table is created.
+        order: see :meth:`BinaryForm.unpack <minform.BinaryForm.unpack>`
+        kind (str): how to return records; see :meth:`BinaryForm.iter_unpack
+            <minform.BinaryForm.iter_unpack>`
+        create (bool): whether to create a new block of shared memory, or
+            attach to an existing one
+        lock: a lock shared by the producer and consumer, to make the queue
+            safe on CPUs that may reorder writes. It's passed along when the
+            table is pickled, so it has to be picklable to the same extent
+            (e.g. a :class:`multiprocessing.Lock` can be passed to a new
+            :class:`multiprocessing.Process`).
+
+    Attributes:
+        name (str): the name of the shared memory block
+    """
+
+    def __init__(self, form_class, capacity, name=None, order=None,
+                 kind='dict', create=True, lock=None):
+        from multiprocessing import shared_memory
+
+        if capacity < 1:
+            raise ValueError('A SharedTable needs at least one slot')
+        self.form_class = form_class
+        self.capacity = capacity
+        self.order = order
+        self.kind = kind
+        self._size = form_class.size
+        self._codec = form_class.codec(order)
+        self._decode = form_class._decoder(order, kind)
+        if form_class._keeps_buffers:
+            # Lazy lists would refer to the slot, which may be overwritten,
+            # so decode from a copy of it.
+            decode = self._decode
+            size = self._size
+            self._decode = lambda buffer, offset: decode(
+                bytes(buffer[offset:offset + size]), 0)
+        self._lock = lock
+
+        options = {}
+        if not create and sys.version_info >= (3, 13):
+            # Only the creator should unlink the block.
+            options['track'] = False
+        self._memory = shared_memory.SharedMemory(
+            name=name, create=create,
+            size=_HEADER_SIZE + capacity * self._size, **options)
+        self._buffer = self._memory.buf
+        self.name = self._memory.name
+        if create:
+            _INDEX.pack_into(self._buffer, _WRITE_INDEX, 0)
+            _INDEX.pack_into(self._buffer, _READ_INDEX, 0)
+
+    def __reduce__(self):
+        return (SharedTable, (self.form_class, self.capacity, self.name,
+                              self.order, self.kind, False, self._lock))
+
+    def __len__(self):
+        return self.capacity
+
+    def _offset(self, index):
+        if index < 0:
+            index += self.capacity
+        if not 0 <= index < self.capacity:
+            raise IndexError('SharedTable index out of range')
+        return _HEADER_SIZE + index * self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            indices = six.moves.range(*index.indices(self.capacity))
+            return [self[i] for i in indices]
+        return self._decode(self._buffer, self._offset(index))
+
+    def __setitem__(self, index, record):
+        if isinstance(record, BinaryForm):
+            record = record.data
+        self._codec.pack_into(self._buffer, self._offset(index), record)
+
+    def view(self, index):
+        """
+        Get a lazy, writable :class:`~minform.views.RecordView` of a slot.
+        """
+        return self.form_class._view_at(self._buffer, self._offset(index),
+                                        self.order)
+
+    @property
+    def queued(self):
+        """
+        The number of records that have been :meth:`put` but not yet
+        :meth:`get`.
+        """
+        written = _INDEX.unpack_from(self._buffer, _WRITE_INDEX)[0]
+        read = _INDEX.unpack_from(self._buffer, _READ_INDEX)[0]
+        return written - read
+
+    def put(self, record):
+        """
+        Add a record to the queue. Only one process may call this.
+
+        Returns:
+            bool: ``True`` if the record was added, or ``False`` if the
+            queue was full
+        """
+        if self._lock is None:
+            return self._put(record)
+        with self._lock:
+            return self._put(record)
+
+    def _put(self, record):
+        buffer = self._buffer
+        written = _INDEX.unpack_from(buffer, _WRITE_INDEX)[0]
+        read = _INDEX.unpack_from(buffer, _READ_INDEX)[0]
+        if written - read >= self.capacity:
+            return False
+        if isinstance(record, BinaryForm):
+            record = record.data
+        offset = _HEADER_SIZE + (written % self.capacity) * self._size
+        self._codec.pack_into(buffer, offset, record)
+        _INDEX.pack_into(buffer, _WRITE_INDEX, written + 1)
+        return True
+
+    def get(self):
+        """
+        Take the oldest record from the queue. Only one process may call
+        this.
+
+        Returns:
+            the record, or ``None`` if the queue was empty
+        """
+        if self._lock is None:
+            return self._get()
+        with self._lock:
+            return self._get()
+
+    def _get(self):
+        buffer = self._buffer
+        read = _INDEX.unpack_from(buffer, _READ_INDEX)[0]
+        written = _INDEX.unpack_from(buffer, _WRITE_INDEX)[0]
+        if read == written:
+            return None
+        offset = _HEADER_SIZE + (read % self.capacity) * self._size
+        record = self._decode(buffer, offset)
+        _INDEX.pack_into(buffer, _READ_INDEX, read + 1)
+        return record
+
+    def close(self):
+        """
+        Detach from the shared memory. Any views of the table can't be used
+        afterwards.
+        """
+        self._buffer = None
+        self._memory.close()
+
+    def unlink(self):
+        """
+        Free the shared memory, once every process has closed the table.
+        This should be called once, usually by the process that created it.
+        """
+        self._memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self):
+        return '<SharedTable {0!r} of {1} x {2}>'.format(
+            self.name, self.capacity, self.form_class.__name__)
+
+
+class RecordQueue(object):
+
+    """
+    Wrapper for a :class:`multiprocessing.Queue` (or any queue with ``put``
+    and ``get`` methods) that sends batches of records as packed buffers.
+
+    Each :meth:`put` packs a batch of records into a single buffer, so the
+    queue only has to pickle one ``bytes`` object per batch, and
+    :meth:`get` unpacks a whole batch at once:
+
+    .. code-block:: python
+
+        queue = minform.RecordQueue(Quote)
+        worker = multiprocessing.Process(target=consume, args=(queue,))
+        worker.start()
+        queue.put(quotes)
+
+        # In the worker:
+        for quote in queue.get():
+            ...
+
+    An empty batch is sent as an empty buffer, which makes a convenient
+    end-of-stream marker.
+
+    Parameters:
+        form_class: the :class:`~minform.BinaryForm` subclass of the
+            records
+        queue: the queue to wrap. By default, a new
+            :class:`multiprocessing.Queue` is created.
+        order: see :meth:`BinaryForm.unpack <minform.BinaryForm.unpack>`
+        kind (str): how :meth:`get` returns records; see
+            :meth:`BinaryForm.iter_unpack <minform.BinaryForm.iter_unpack>`
+
+    Attributes:
+        queue: the wrapped queue
+    """
+
+    def __init__(self, form_class, queue=None, order=None, kind='dict'):
+        if queue is None:
+            import multiprocessing
+            queue = multiprocessing.Queue()
+        self.form_class = form_class
+        self.queue = queue
+        self.order = order
+        self.kind = kind
+
+    def put(self, records, block=True, timeout=None):
+        """
+        Pack a batch of records (dicts of data or
+        :class:`~minform.BinaryForm` instances) into one buffer, and put it
+        on the queue.
+        """
+        buffer = self.form_class.pack_many(records, order=self.order)
+        self.queue.put(bytes(buffer), block, timeout)
+
+    def get(self, block=True, timeout=None):
+        """
+        Get the next batch of records from the queue.
+
+        Returns:
+            list: the unpacked records
+        """
+        buffer = self.queue.get(block, timeout)
+        return self.form_class.unpack_many(buffer, order=self.order,
+                                           kind=self.kind)
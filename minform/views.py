@@ -0,0 +1,241 @@
+import six
+
+try:
+    from collections.abc import Sequence
+except ImportError:  # pragma: no cover
+    from collections import Sequence
+
+
+class RecordView(object):
+
+    """
+    Lazy view of one packed :class:`~minform.BinaryForm` record.
+
+    A view holds a reference to the buffer that contains the record, and
+    only decodes a field when it is first accessed (as an attribute, or by
+    name with ``view['name']``). Decoded values are memoized, so a view
+    assumes that the underlying bytes won't change while it's in use.
+
+    Nested :class:`~minform.BinaryFormField` fields are returned as nested
+    :class:`RecordView` instances, and :class:`~minform.BinaryFieldList`
+    fields as :class:`ListView` sequences, so even deeply nested records
+    only decode what is used.
+
+    If the buffer is writable (e.g. a ``bytearray`` or ``mmap``), fields can
+    also be assigned to, as attributes or by name. Only the bytes of that
+    field are re-encoded, in place, using the field's own byte order if it
+    has one:
+
+    .. code-block:: python
+
+        view = Packet.view(buffer, offset)
+        view.sequence = view.sequence + 1
+        view.header.checksum = 0
+
+    Views are created with :meth:`BinaryForm.view
+    <minform.BinaryForm.view>`; each form class gets its own
+    :class:`RecordView` subclass, with one attribute per field.
+    """
+
+    __slots__ = ('_buffer', '_offset', '_order', '_cache')
+
+    _form_class = None
+    _field_names = ()
+
+    def __init__(self, buffer, offset, order):
+        self._buffer = buffer
+        self._offset = offset
+        self._order = order
+        self._cache = {}
+
+    def __getitem__(self, name):
+        if name not in self._field_names:
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def __setitem__(self, name, value):
+        if name not in self._field_names:
+            raise KeyError(name)
+        setattr(self, name, value)
+
+    def __repr__(self):
+        return '<{0} at offset {1}>'.format(type(self).__name__,
+                                            self._offset)
+
+    def _asdict(self):
+        """
+        Decode the whole record into a plain dict, as
+        :meth:`BinaryForm.unpack_dict <minform.BinaryForm.unpack_dict>` would.
+        """
+        codec = self._form_class.codec(self._order)
+        return codec.unpack_from(self._buffer, self._offset)
+
+
+class _FieldAccessor(object):
+
+    # Descriptor that decodes (and memoizes) one field of a RecordView.
+
+    def __init__(self, slot):
+        self.name = slot.name
+        self.item = slot.item
+        self.offset = slot.offset
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        cache = view._cache
+        try:
+            return cache[self.name]
+        except KeyError:
+            value = self.item._view_from(view._buffer,
+                                         view._offset + self.offset,
+                                         view._order)
+            cache[self.name] = value
+            return value
+
+    def __set__(self, view, value):
+        self.item._pack_into(view._buffer, view._offset + self.offset, value,
+                             view._order)
+        # The packed value may not decode to exactly what was assigned (e.g.
+        # AUTOMATIC bytes lose trailing nulls), so decode it again if needed.
+        view._cache.pop(self.name, None)
+
+
+def view_class(form_class, layout):
+    """
+    Create the :class:`RecordView` subclass for a form class.
+    """
+
+    namespace = {
+        '__slots__': (),
+        '_form_class': form_class,
+        '_field_names': tuple(slot.name for slot in layout.slots
+                              if slot.has_field),
+    }
+    for slot in layout.slots:
+        if slot.has_field:
+            namespace[slot.name] = _FieldAccessor(slot)
+    name = '{0}View'.format(form_class.__name__)
+    return type(name, (RecordView,), namespace)
+
+
+class ListView(Sequence):
+
+    """
+    Lazy, sliceable sequence over the entries of a packed
+    :class:`~minform.BinaryFieldList`.
+
+    Entries are decoded each time they are indexed or iterated over, and
+    slicing returns another :class:`ListView` over the same buffer rather
+    than a copy. For :data:`~minform.EXPLICIT` lists, the length comes from
+    the packed count prefix.
+
+    If the buffer is writable, existing entries can be assigned to by index,
+    re-encoding just that entry in place. To change the number of entries,
+    assign a whole new list to the field of the parent :class:`RecordView`.
+    """
+
+    def __init__(self, field, buffer, offset, order, entries=None):
+        self._field = field
+        self._buffer = buffer
+        self._offset = offset
+        self._order = order
+
+        self._start = offset + field.prefix_size
+
+        # The (first, step, length) range of entries that this view covers;
+        # None until the count prefix has been read.
+        self._entries = entries
+
+    def _range(self):
+        if self._entries is None:
+            count = self._field._count_from(self._buffer, self._offset)
+            self._entries = (0, 1, count)
+        return self._entries
+
+    def __len__(self):
+        return self._range()[2]
+
+    def __getitem__(self, index):
+        first, step, length = self._range()
+
+        if isinstance(index, slice):
+            start, stop, stride = index.indices(length)
+            count = len(six.moves.range(start, stop, stride))
+            entries = (first + start * step, step * stride, count)
+            return type(self)(self._field, self._buffer, self._offset,
+                              self._order, entries)
+
+        decode = self._decoder()
+        return decode(self._buffer, self._entry_offset(index), self._order)
+
+    def _decoder(self):
+        # Entries are decoded as views too, so nested records stay lazy.
+        return self._field.inner_field._view_from
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            raise TypeError('ListView does not support slice assignment')
+        inner_field = self._field.inner_field
+        inner_field._pack_into(self._buffer, self._entry_offset(index),
+                               value, self._order)
+
+    def _entry_offset(self, index):
+        first, step, length = self._range()
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError('ListView index out of range')
+        entry = first + index * step
+        return self._start + entry * self._field.inner_field.size
+
+    def __iter__(self):
+        first, step, length = self._range()
+        inner_field = self._field.inner_field
+        decode = self._decoder()
+        buffer = self._buffer
+        order = self._order
+        stride = step * inner_field.size
+        offset = self._start + first * inner_field.size
+        for i in six.moves.range(length):
+            yield decode(buffer, offset, order)
+            offset += stride
+
+    def __eq__(self, other):
+        if isinstance(other, (ListView, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        if result is NotImplemented:
+            return result
+        return not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return '<{0} of {1} entries>'.format(type(self).__name__, len(self))
+
+
+class ReadOnlyListView(ListView):
+
+    """
+    Read-only :class:`ListView`, returned when unpacking a
+    :class:`~minform.BinaryFieldList` that was created with ``lazy=True``.
+
+    Entries are decoded exactly as :meth:`~minform.BinaryItem.unpack` would
+    decode them (so nested forms become dicts, not views), but only when they
+    are indexed or iterated over. Slicing doesn't copy anything, and the
+    length comes from the :data:`~minform.EXPLICIT` count prefix, which is
+    checked when the list is unpacked.
+
+    The view keeps a reference to the unpacked buffer, so the buffer
+    shouldn't be modified while the view is in use.
+    """
+
+    def __setitem__(self, index, value):
+        raise TypeError('ReadOnlyListView does not support item assignment')
+
+    def _decoder(self):
+        return self._field.inner_field._unpack_from
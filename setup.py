@@ -55,6 +55,9 @@ setup(
                  'minform'},
     include_package_data=True,
     install_requires=requirements,
+    extras_require={
+        'numpy': ['numpy'],
+    },
     license="ISCL",
     zip_safe=False,
     keywords='minform wtforms struct binary',
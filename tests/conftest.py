@@ -0,0 +1,6 @@
+import sys
+
+# The asyncio helpers need async generators.
+collect_ignore = []
+if sys.version_info < (3, 6):
+    collect_ignore.append('test_aio.py')
@@ -0,0 +1,285 @@
+import asyncio
+import struct
+import unittest
+
+import pytest
+import minform
+import minform.aio
+
+
+class Form(minform.BinaryForm):
+    order = minform.BIG_ENDIAN
+
+    a = minform.UInt32Field()
+    b = minform.Int16Field()
+
+
+records = [dict(a=i * 1000, b=-i) for i in range(10)]
+buf = b''.join(struct.pack('>Ih', i * 1000, -i) for i in range(10))
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def collect(reader, **kwargs):
+    return [record async for record in Form.aiter_stream(reader, **kwargs)]
+
+
+def stream_reader(*pieces):
+    async def make():
+        reader = asyncio.StreamReader()
+        for piece in pieces:
+            reader.feed_data(piece)
+        reader.feed_eof()
+        return reader
+    return make()
+
+
+class Writer(object):
+
+    def __init__(self):
+        self.writes = []
+        self.drains = 0
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+
+    async def drain(self):
+        self.drains += 1
+
+
+class TestAsyncStreams(unittest.TestCase):
+
+    def read(self, pieces, **kwargs):
+        async def main():
+            reader = await stream_reader(*pieces)
+            return await collect(reader, **kwargs)
+        return run(main())
+
+    def test_records_are_read(self):
+        forms = self.read([buf])
+        assert [form.data for form in forms] == records
+
+    def test_records_can_straddle_reads(self):
+        pieces = [buf[i:i + 5] for i in range(0, len(buf), 5)]
+        assert self.read(pieces, kind='dict') == records
+        assert self.read([buf], chunk_records=3, kind='dict') == records
+
+    def test_records_can_arrive_later(self):
+        async def main():
+            reader = asyncio.StreamReader()
+            reader.feed_data(buf[:8])
+
+            async def feed():
+                await asyncio.sleep(0)
+                reader.feed_data(buf[8:])
+                reader.feed_eof()
+
+            task = asyncio.ensure_future(feed())
+            result = await collect(reader, kind='dict')
+            await task
+            return result
+        assert run(main()) == records
+
+    def test_truncated_streams_are_flagged(self):
+        with pytest.raises(ValueError):
+            self.read([buf[:-1]], kind='dict')
+
+    def test_arguments_are_checked(self):
+        with pytest.raises(ValueError):
+            Form.aiter_stream(None, kind='list')
+
+    def test_records_are_written_in_chunks(self):
+        writer = Writer()
+        written = run(Form.awrite(writer, records, chunk_records=4))
+        assert written == len(buf)
+        assert [len(data) for data in writer.writes] == [24, 24, 12]
+        assert b''.join(writer.writes) == buf
+        assert writer.drains == 3
+
+    def test_forms_are_written(self):
+        writer = Writer()
+        forms = (Form(data=record) for record in records)
+        run(Form.awrite(writer, forms))
+        assert writer.writes == [buf]
+
+
+class TestRecordProtocol(unittest.TestCase):
+
+    def feed(self, protocol, data, step):
+        # Deliver data the way an event loop would.
+        while data:
+            target = protocol.get_buffer(-1)
+            n = min(step, len(target), len(data))
+            target[:n] = data[:n]
+            protocol.buffer_updated(n)
+            data = data[n:]
+
+    def test_records_are_decoded(self):
+        received = []
+        protocol = minform.aio.RecordProtocol(Form, received.append)
+        self.feed(protocol, buf, len(buf))
+        assert received == records
+
+    def test_records_can_straddle_reads_and_buffer_ends(self):
+        for step in (1, 5, 7, 13):
+            received = []
+            protocol = minform.aio.RecordProtocol(Form, received.append,
+                                                  capacity_records=2)
+            self.feed(protocol, buf * 3, step)
+            assert received == records * 3
+
+    def test_buffer_is_reused(self):
+        protocol = minform.aio.RecordProtocol(Form, lambda record: None,
+                                              capacity_records=2)
+        buffer = protocol._buffer
+        self.feed(protocol, buf, 5)
+        assert protocol._buffer is buffer
+        assert len(buffer) == Form.size * 2
+
+    def test_record_kinds(self):
+        received = []
+        protocol = minform.aio.RecordProtocol(Form, received.append,
+                                              kind='tuple')
+        self.feed(protocol, buf[:6], 6)
+        assert received == [(0, 0)]
+
+        views = []
+        protocol = minform.aio.RecordProtocol(
+            Form, lambda view: views.append(view.a), kind='view')
+        self.feed(protocol, buf, 6)
+        assert views == [record['a'] for record in records]
+
+        with pytest.raises(ValueError):
+            minform.aio.RecordProtocol(Form, None, kind='list')
+
+    def test_lazy_lists_stay_valid(self):
+        class Lazy(minform.BinaryForm):
+            entries = minform.BinaryFieldList(minform.UInt8Field(),
+                                              max_entries=2,
+                                              length=minform.FIXED, lazy=True)
+
+        received = []
+        protocol = minform.aio.RecordProtocol(Lazy, received.append,
+                                              capacity_records=2)
+        data = b''.join(bytes(bytearray([i, i + 1])) for i in range(6))
+        self.feed(protocol, data, 3)
+        assert [list(record['entries']) for record in received] == \
+            [[i, i + 1] for i in range(6)]
+
+    def test_truncated_streams_are_reported(self):
+        closed = []
+        protocol = minform.aio.RecordProtocol(Form, lambda record: None,
+                                              close_callback=closed.append)
+        self.feed(protocol, buf[:-1], 100)
+        assert not protocol.eof_received()
+        protocol.connection_lost(None)
+        assert isinstance(protocol.exception, ValueError)
+        assert closed == [protocol.exception]
+
+    def test_clean_streams_are_reported(self):
+        closed = []
+        protocol = minform.aio.RecordProtocol(Form, lambda record: None,
+                                              close_callback=closed.append)
+        self.feed(protocol, buf, 100)
+        protocol.eof_received()
+        protocol.connection_lost(None)
+        assert protocol.exception is None
+        assert closed == [None]
+
+    def test_records_are_not_redelivered_after_errors(self):
+        received = []
+
+        def callback(record):
+            received.append(record)
+            if len(received) == 2:
+                raise RuntimeError
+
+        protocol = minform.aio.RecordProtocol(Form, callback)
+        target = protocol.get_buffer(-1)
+        target[:len(buf)] = buf
+        with pytest.raises(RuntimeError):
+            protocol.buffer_updated(len(buf))
+        protocol.get_buffer(-1)
+        protocol.buffer_updated(0)
+        assert received == records
+
+    def test_datagrams_are_decoded(self):
+        received = []
+        protocol = minform.aio.RecordProtocol(Form, received.append)
+        protocol.datagram_received(buf, None)
+        assert received == records
+
+    def test_datagram_errors_are_reported(self):
+        errors = []
+        protocol = minform.aio.RecordProtocol(Form, lambda record: None,
+                                              error_callback=errors.append)
+        protocol.datagram_received(buf[:-1], None)
+        protocol.error_received(OSError('refused'))
+        assert [type(error) for error in errors] == [ValueError, OSError]
+        assert protocol.exception is None
+
+    def test_datagram_errors_end_the_connection_by_default(self):
+        class Transport(object):
+            closed = False
+
+            def close(self):
+                self.closed = True
+
+        closed = []
+        protocol = minform.aio.RecordProtocol(Form, lambda record: None,
+                                              close_callback=closed.append)
+        transport = Transport()
+        protocol.connection_made(transport)
+        protocol.error_received(OSError('refused'))
+        assert transport.closed
+        protocol.connection_lost(None)
+        assert isinstance(protocol.exception, OSError)
+        assert closed == [protocol.exception]
+
+    def test_protocol_reports_truncated_connections(self):
+        import socket
+        closed = []
+
+        async def main():
+            loop = asyncio.get_event_loop()
+            done = loop.create_future()
+            ours, theirs = socket.socketpair()
+            transport, protocol = await loop.create_connection(
+                lambda: minform.aio.RecordProtocol(
+                    Form, lambda record: None,
+                    close_callback=done.set_result),
+                sock=ours)
+            with theirs:
+                theirs.sendall(buf[:-1])
+            closed.append(await asyncio.wait_for(done, 1))
+
+        run(main())
+        assert isinstance(closed[0], ValueError)
+
+    def test_protocol_reads_from_connections(self):
+        import socket
+        received = []
+
+        async def main():
+            loop = asyncio.get_event_loop()
+            ours, theirs = socket.socketpair()
+            transport, protocol = await loop.create_connection(
+                lambda: minform.aio.RecordProtocol(Form, received.append,
+                                                   capacity_records=3),
+                sock=ours)
+            with theirs:
+                theirs.sendall(buf)
+            for i in range(100):
+                if len(received) == len(records):
+                    break
+                await asyncio.sleep(0.01)
+            transport.close()
+
+        run(main())
+        assert received == records
@@ -220,6 +220,18 @@ class TestFixedBytesField(unittest.TestCase):
     def test_null_string(self):
         self.check(b'\x00' * 10)
 
+    def test_subclasses_can_override_packing(self):
+        class Upper(minform.BytesField):
+            def unpack_data(self, buffer, order):
+                return super(Upper, self).unpack_data(buffer, order).upper()
+
+        class Form(minform.BinaryForm):
+            a = Upper(max_length=3, length=minform.FIXED)
+            b = minform.BytesField(max_length=3, length=minform.FIXED)
+
+        assert Form.unpack(b'abcdef').data == dict(a=b'ABC', b=b'def')
+        assert Form.unpack_dict(b'abcdef') == dict(a=b'ABC', b=b'def')
+
 
 class TestExplicitBytesField(unittest.TestCase):
 
@@ -260,6 +272,18 @@ class TestExplicitBytesField(unittest.TestCase):
         buf = f.pack()
         assert buf == b'\x03foo\x00\x00\x00\x00\x00\x00\x00'
 
+    def test_too_long_bytes_are_rejected(self):
+        f = self.ShortForm(s=b'x' * 11)
+        with pytest.raises(ValueError):
+            f.pack()
+
+    def test_unpack_from_memoryview_returns_bytes(self):
+        field = minform.BytesField(max_length=10, length=minform.EXPLICIT)
+        buf = memoryview(b'\0\x03foo' + b'\0' * 7)
+        data = field.unpack_from(buf, 1)
+        assert type(data) is bytes
+        assert data == b'foo'
+
 
 class TestVariableBytesField(util.FormTest):
 
@@ -1,3 +1,6 @@
+import struct
+import unittest
+
 import pytest
 import wtforms
 import minform
@@ -126,6 +129,17 @@ class TestExplicitFieldList(util.FormTest):
         with pytest.raises(ValueError):
             self.Form.unpack(b'\x05\x00\x00\x00\x00\x00\x00\x00\x00')
 
+    def test_pack_into_clears_unused_entries(self):
+        field = self.Form._binary_items[0]
+        buf = bytearray(b'\xff' * 10)
+        field.pack_into(buf, 1, [0x1234], order=minform.BIG_ENDIAN)
+        assert buf == b'\xff\x01\x12\x34\0\0\0\0\0\0'
+
+    def test_too_many_entries_are_rejected(self):
+        field = self.Form._binary_items[0]
+        with pytest.raises(ValueError):
+            field.pack([1, 2, 3, 4, 5])
+
 
 class TestFixedFieldList(util.FormTest):
 
@@ -149,6 +163,79 @@ class TestFixedFieldList(util.FormTest):
         assert form.pack() == buf
 
 
+class TestNumericFieldList(unittest.TestCase):
+
+    samples = minform.BinaryFieldList(minform.UInt16Field(),
+                                      max_entries=4096, length=minform.FIXED)
+    counted = minform.BinaryFieldList(minform.Int32Field(), max_entries=300)
+
+    def test_numeric_entries_use_one_struct(self):
+        data = list(range(4096))
+        buf = self.samples.pack(data, order=minform.BIG_ENDIAN)
+        assert bytes(buf) == struct.pack('>4096H', *data)
+        assert self.samples.unpack(buf, order=minform.BIG_ENDIAN) == data
+        assert ('>', 4096) in self.samples._entries_structs
+
+    def test_explicit_count_sets_struct_length(self):
+        data = [-1, 0, 70000]
+        buf = self.counted.pack(data, order=minform.LITTLE_ENDIAN)
+        assert bytes(buf[:14]) == struct.pack('<Hiii', 3, *data)
+        assert buf[14:] == b'\0' * (self.counted.size - 14)
+        assert self.counted.unpack(buf, order=minform.LITTLE_ENDIAN) == data
+
+    def test_inner_order_overrides_list_order(self):
+        field = minform.BinaryFieldList(
+            minform.UInt16Field(order=minform.LITTLE_ENDIAN), max_entries=2,
+            length=minform.FIXED, order=minform.BIG_ENDIAN)
+        assert field.pack([1, 2]) == b'\x01\0\x02\0'
+        assert field.unpack(b'\x01\0\x02\0') == [1, 2]
+
+    def test_out_of_range_entries_are_rejected(self):
+        with pytest.raises(struct.error):
+            self.samples.pack([-1])
+
+    def test_overriding_entries_use_their_own_methods(self):
+        class Scaled(minform.Int16Field):
+            def unpack_data(self, buffer, order):
+                return super(Scaled, self).unpack_data(buffer, order) / 100.0
+
+            def pack_data(self, data, order):
+                return super(Scaled, self).pack_data(int(data * 100), order)
+
+        field = minform.BinaryFieldList(Scaled(), max_entries=2,
+                                        length=minform.FIXED,
+                                        order=minform.LITTLE_ENDIAN)
+        assert field._entries_structs is None
+        assert field.unpack(b'\x10\x27\x10\x27') == [100, 100]
+        assert field.pack([1, 2]) == b'\x64\0\xc8\0'
+
+    def test_fixed_bytes_entries_round_trip(self):
+        field = minform.BinaryFieldList(
+            minform.BytesField(max_length=3, length=minform.FIXED),
+            max_entries=2, length=minform.FIXED)
+        assert field._entries_structs is None
+        buf = field.pack([b'abc', b'def'])
+        assert bytes(buf) == b'abcdef'
+        assert field.unpack(buf) == [b'abc', b'def']
+
+    def test_automatic_bytes_entries_are_stripped(self):
+        field = minform.BinaryFieldList(
+            minform.BytesField(max_length=3, length=minform.AUTOMATIC),
+            max_entries=2, length=minform.FIXED)
+        buf = field.pack([b'a', b'bc'])
+        assert bytes(buf) == b'a\0\0bc\0'
+        assert field.unpack(buf) == [b'a', b'bc']
+
+    def test_explicit_bytes_entries_use_their_counts(self):
+        field = minform.BinaryFieldList(
+            minform.BytesField(max_length=2, length=minform.EXPLICIT),
+            max_entries=2)
+        assert field.unpack(field.pack([])) == []
+        buf = field.pack([b'a', b'bc'])
+        assert bytes(buf) == b'\x02\x01a\0\x02bc'
+        assert field.unpack(buf) == [b'a', b'bc']
+
+
 class F2(minform.BinaryForm):
     char = minform.CharField()
     int32 = minform.Int32Field()
@@ -204,6 +291,11 @@ class TestBinaryFormField(util.FormTest):
         form = self.Form.unpack(self.buf)
         assert form.data == self.data
 
+    def test_nested_form_can_be_unpacked_to_dicts(self):
+        data = self.Form.unpack_dict(self.buf)
+        assert type(data['f']) is dict
+        assert data == self.data
+
     def test_binary_form_field_requires_binary_form(self):
         class F1(wtforms.Form):
             pass
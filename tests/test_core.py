@@ -1,3 +1,9 @@
+import io
+import pickle
+import struct
+import sys
+import threading
+
 import pytest
 import unittest
 import wtforms
@@ -199,3 +205,956 @@ class TestBinaryForm(unittest.TestCase):
         buf = b'\x00\x00' + self.buf
         form = self.Form.unpack_from(buf, -self.size)
         assert form.data == self.data
+
+
+class Scaled(minform.Int16Field):
+    # Stores hundredths.
+
+    def pack_data(self, data, order):
+        return super(Scaled, self).pack_data(int(round(data * 100)), order)
+
+    def unpack_data(self, buffer, order):
+        return super(Scaled, self).unpack_data(buffer, order) / 100.0
+
+
+class TestLayout(unittest.TestCase):
+
+    class FixedForm(minform.BinaryForm):
+        order = minform.BIG_ENDIAN
+
+        char = minform.CharField()
+        int32 = minform.Int32Field()
+        _ = minform.BlankBytes(2)
+        fixed = minform.BytesField(max_length=3, length=minform.FIXED)
+        auto = minform.BytesField(max_length=4, length=minform.AUTOMATIC)
+        flag = minform.BinaryBooleanField()
+
+    data = {
+        'char': b'x',
+        'int32': 0x12345678,
+        'fixed': b'ab\0',
+        'auto': b'cd',
+        'flag': True,
+    }
+
+    buf = b'x\x12\x34\x56\x78\0\0ab\0cd\0\0\x01'
+
+    class MixedForm(minform.BinaryForm):
+        a = minform.UInt16Field()
+        b = minform.UInt16Field(order=minform.LITTLE_ENDIAN)
+        c = minform.BytesField(max_length=2, length=minform.EXPLICIT)
+        d = minform.UInt8Field()
+        e = minform.UInt8Field()
+
+    def test_fixed_form_is_a_single_struct(self):
+        layout = self.FixedForm._layout()
+        assert len(layout.steps) == 1
+        assert layout.struct.format in ('>ci2x3s4s?', b'>ci2x3s4s?')
+        assert layout.struct.size == self.FixedForm.size
+
+    def test_layouts_are_compiled_for_every_byte_order(self):
+        for order in minform.core.BYTE_ORDERS:
+            assert order in self.FixedForm._layouts
+
+    def test_fixed_form_unpacks(self):
+        form = self.FixedForm.unpack(self.buf)
+        assert form.data == self.data
+
+    def test_fixed_form_packs(self):
+        form = self.FixedForm(data=self.data)
+        assert form.pack() == self.buf
+
+    def test_order_overrides_split_runs(self):
+        layout = self.MixedForm._layout(minform.BIG_ENDIAN)
+        assert len(layout.steps) == 4
+        assert layout.struct is None
+
+    def test_matching_order_overrides_are_merged(self):
+        layout = self.MixedForm._layout(minform.LITTLE_ENDIAN)
+        assert len(layout.steps) == 3
+
+    def test_overriding_fields_are_not_merged(self):
+        class Form(minform.BinaryForm):
+            order = minform.LITTLE_ENDIAN
+
+            a = Scaled()
+            b = minform.UInt8Field()
+
+        assert Form._binary_items[0].struct_format() is None
+        assert Form._binary_items[1].struct_format() is not None
+        assert not Form._layout().slots[0].is_fixed
+
+        form = Form.unpack(b'\x10\x27\x05')
+        assert form.data == {'a': 100, 'b': 5}
+        assert form.pack() == b'\x10\x27\x05'
+        assert Form.pack_many([{'a': 1.5, 'b': 0}]) == b'\x96\0\0'
+        assert Form.view(b'\x10\x27\x05').a == 100
+        assert Form.project(b'\x10\x27\x05', ['a']) == {'a': 100}
+        columns = Form.unpack_columns(b'\x10\x27\x05')
+        assert list(columns['a']) == [100]
+        assert Form.pack_columns(columns) == b'\x10\x27\x05'
+
+    def test_mixed_form_round_trips(self):
+        buf = b'\x12\x34\x34\x12\x01z\0\x05\x06'
+        form = self.MixedForm.unpack(buf, order=minform.BIG_ENDIAN)
+        assert form.data == dict(a=0x1234, b=0x1234, c=b'z', d=5, e=6)
+        assert form.pack(order=minform.BIG_ENDIAN) == buf
+
+
+class Point(minform.BinaryForm):
+    x = minform.Int16Field()
+    y = minform.Int16Field()
+    name = minform.BytesField(max_length=3, length=minform.AUTOMATIC)
+
+
+class Segment(minform.BinaryForm):
+    start = minform.BinaryFormField(Point)
+    end = minform.BinaryFormField(Point, order=minform.LITTLE_ENDIAN)
+
+
+class TestNestedLayout(unittest.TestCase):
+
+    class Path(minform.BinaryForm):
+        order = minform.BIG_ENDIAN
+
+        count = minform.UInt8Field()
+        _ = minform.BlankBytes(1)
+        segment = minform.BinaryFormField(Segment)
+        points = minform.BinaryFieldList(minform.BinaryFormField(Point),
+                                         max_entries=2, length=minform.FIXED)
+
+    data = {
+        'count': 3,
+        'segment': {
+            'start': {'x': 1, 'y': -1, 'name': b'a'},
+            'end': {'x': 2, 'y': -2, 'name': b'bc'},
+        },
+        'points': [
+            {'x': 3, 'y': -3, 'name': b'def'},
+            {'x': 4, 'y': -4, 'name': b''},
+        ],
+    }
+
+    buf = (b'\x03\0'
+           b'\0\x01\xff\xffa\0\0\0\x02\xff\xfebc\0'
+           b'\0\x03\xff\xfddef\0\x04\xff\xfc\0\0\0')
+
+    def test_nested_forms_are_inlined(self):
+        layout = self.Path._layout()
+        assert len(layout.steps) == 1
+        assert layout.struct.size == self.Path.size
+        paths = [path for path, kind, slot in layout.nodes]
+        assert ('segment', 'end', 'x') in paths
+        assert layout.lists == [(('points',), 2)]
+
+    def test_nested_forms_unpack(self):
+        assert self.Path.unpack_dict(self.buf) == self.data
+        assert self.Path.unpack(self.buf).data == self.data
+        assert self.Path.unpack_tuple(self.buf) == (
+            3, self.data['segment'], self.data['points'])
+
+    def test_nested_forms_pack(self):
+        assert self.Path(data=self.data).pack() == self.buf
+        assert self.Path.codec().pack(self.data) == self.buf
+
+    def test_nested_orders_are_kept(self):
+        buf = self.Path.codec(minform.LITTLE_ENDIAN).pack(self.data)
+        assert buf[:4] == b'\x03\0\x01\0'
+        assert self.Path.unpack_dict(buf,
+                                     order=minform.LITTLE_ENDIAN) == self.data
+        layout = Segment._layout()
+        assert [slot.order for path, kind, slot in layout.nodes
+                if kind == 'item'] == ['', '', '', '<', '<', '<']
+
+    def test_short_lists_are_packed_item_by_item(self):
+        data = dict(self.data, points=self.data['points'][:1])
+        buf = bytearray(b'\xff' * self.Path.size)
+        self.Path.codec().pack_into(buf, 0, data)
+        assert buf == self.buf[:-7] + b'\0' * 7
+
+    def test_long_lists_are_rejected(self):
+        data = dict(self.data, points=self.data['points'] * 2)
+        with pytest.raises(ValueError):
+            self.Path.codec().pack(data)
+
+    def test_missing_nested_data_uses_defaults(self):
+        class Defaulted(minform.BinaryForm):
+            x = minform.Int16Field()
+            y = minform.Int16Field(default=7)
+
+        class Form(minform.BinaryForm):
+            inner = minform.BinaryFormField(Defaulted)
+
+        buf = Form.codec().pack({'inner': {'x': 1}})
+        assert Form.unpack_dict(buf) == {'inner': {'x': 1, 'y': 7}}
+
+    def test_only_fixed_lists_of_forms_are_inlined(self):
+        class Form(minform.BinaryForm):
+            explicit = minform.BinaryFieldList(
+                minform.BinaryFormField(Point), max_entries=2)
+            lazy = minform.BinaryFieldList(
+                minform.BinaryFormField(Point), max_entries=2,
+                length=minform.FIXED, lazy=True)
+            long = minform.BinaryFieldList(
+                minform.BinaryFormField(Point), max_entries=1000,
+                length=minform.FIXED)
+            numbers = minform.BinaryFieldList(minform.UInt8Field(),
+                                              max_entries=2,
+                                              length=minform.FIXED)
+        layout = Form._layout()
+        assert not layout.lists
+        assert len(layout.nodes) == 4
+
+
+class TestCodec(unittest.TestCase):
+
+    Form = TestBinaryForm.Form
+    data = TestBinaryForm.data
+    buf = TestBinaryForm.buf
+
+    def test_codec_is_cached_per_order(self):
+        codec = self.Form.codec()
+        assert self.Form.codec() is codec
+        assert self.Form.codec(minform.BIG_ENDIAN) is codec
+
+    def test_codec_is_cached_per_class(self):
+        assert TestLayout.FixedForm.codec() is not self.Form.codec()
+
+    def test_codec_source_is_inspectable(self):
+        codec = self.Form.codec()
+        assert 'def unpack_from(buffer, offset=0):' in codec.source
+        assert 'def pack_into(buffer, offset, data):' in codec.source
+        assert "'int32'" in codec.source
+
+    def test_codec_source_is_registered_per_class(self):
+        import gc
+        import linecache
+
+        def make():
+            class Form(minform.BinaryForm):
+                a = minform.UInt8Field()
+            return Form
+
+        first, second = make(), make()
+        filenames = [first.codec().filename, second.codec().filename]
+        assert filenames[0] != filenames[1]
+        assert all(name in linecache.cache for name in filenames)
+        del first, second
+        gc.collect()
+        assert not any(name in linecache.cache for name in filenames)
+
+    def test_codec_unpacks_at_offset(self):
+        codec = self.Form.codec()
+        assert codec.unpack_from(b'\0\0' + self.buf, 2) == self.data
+
+    def test_codec_packs(self):
+        codec = self.Form.codec()
+        assert codec.pack(self.data) == self.buf
+
+    def test_codec_packs_into_offset(self):
+        codec = self.Form.codec()
+        buf = bytearray(self.Form.size + 2)
+        codec.pack_into(buf, 2, self.data)
+        assert bytes(buf[2:]) == self.buf
+
+    def test_single_struct_codec_packs_without_a_buffer(self):
+        codec = TestLayout.FixedForm.codec()
+        assert 'bytearray' not in codec.source
+        assert codec.pack(TestLayout.data) == TestLayout.buf
+
+    def test_long_bytes_are_rejected(self):
+        for length in [minform.FIXED, minform.AUTOMATIC]:
+            class Form(minform.BinaryForm):
+                a = minform.UInt8Field()
+                b = minform.BytesField(max_length=3, length=length)
+
+            form = Form(data={'a': 1, 'b': b'abcdef'})
+            with pytest.raises(ValueError):
+                form.pack()
+            with pytest.raises(ValueError):
+                Form.pack_many([form.data])
+            buf = bytearray(Form.size)
+            with pytest.raises(ValueError):
+                Form.codec().pack_into(buf, 0, form.data)
+        with pytest.raises(ValueError):
+            Segment.codec().pack({'start': {'x': 0, 'y': 0, 'name': b'abcd'},
+                                  'end': {'x': 0, 'y': 0, 'name': b''}})
+
+    def test_empty_form_has_a_codec(self):
+        class Empty(minform.BinaryForm):
+            pass
+
+        assert Empty.codec().pack({}) == b''
+        assert Empty.codec().unpack_from(b'') == {}
+
+
+class TestRawUnpack(unittest.TestCase):
+
+    Form = TestBinaryForm.Form
+    data = TestBinaryForm.data
+    buf = TestBinaryForm.buf
+
+    def test_unpack_dict_returns_plain_data(self):
+        data = self.Form.unpack_dict(self.buf)
+        assert type(data) is dict
+        assert data == self.data
+
+    def test_unpack_dict_checks_size(self):
+        with pytest.raises(ValueError):
+            self.Form.unpack_dict(self.buf[:-1])
+
+    def test_unpack_tuple_returns_named_tuple(self):
+        record = self.Form.unpack_tuple(self.buf)
+        assert isinstance(record, self.Form.record_type())
+        assert record.int32 == 0x12345678
+        assert record._asdict() == self.data
+
+    def test_unpack_tuple_checks_size(self):
+        with pytest.raises(ValueError):
+            self.Form.unpack_tuple(self.buf + b'\0')
+
+    def test_record_type_has_fields_in_packed_order(self):
+        record_type = self.Form.record_type()
+        assert record_type._fields == (
+            'char', 'int32', 'bytes', 'lst', 'end', 'lst2')
+        assert self.Form.record_type() is record_type
+
+
+class TestBatchUnpack(unittest.TestCase):
+
+    Form = TestBinaryForm.Form
+    data = TestBinaryForm.data
+    buf = TestBinaryForm.buf
+
+    FixedForm = TestLayout.FixedForm
+
+    class TupleForm(minform.BinaryForm):
+        order = minform.LITTLE_ENDIAN
+
+        a = minform.UInt16Field()
+        b = minform.Int8Field()
+
+    def test_unpack_many_returns_forms(self):
+        forms = self.Form.unpack_many(self.buf * 3)
+        assert len(forms) == 3
+        assert all(isinstance(form, self.Form) for form in forms)
+        assert all(form.data == self.data for form in forms)
+
+    def test_unpack_many_returns_dicts(self):
+        records = self.Form.unpack_many(self.buf * 3, kind='dict')
+        assert records == [self.data] * 3
+
+    def test_unpack_many_returns_tuples(self):
+        records = self.Form.unpack_many(self.buf * 2, kind='tuple')
+        assert [record._asdict() for record in records] == [self.data] * 2
+
+    def test_unpack_many_uses_struct_records(self):
+        buf = b'\x01\x00\xff\x02\x00\x7f'
+        records = self.TupleForm.unpack_many(buf, kind='tuple')
+        assert records == [(1, -1), (2, 127)]
+        assert records[1].a == 2
+
+    def test_unpack_many_applies_conversions(self):
+        records = self.FixedForm.unpack_many(TestLayout.buf * 2, kind='tuple')
+        assert records[0].auto == b'cd'
+
+    def test_unpack_many_respects_count_and_offset(self):
+        buf = b'\0' + self.buf * 3
+        records = self.Form.unpack_many(buf, count=2, offset=1, kind='dict')
+        assert records == [self.data] * 2
+
+    def test_unpack_many_rejects_partial_records(self):
+        with pytest.raises(ValueError):
+            self.Form.unpack_many(self.buf * 2 + b'\0')
+
+    def test_unpack_many_rejects_large_counts(self):
+        with pytest.raises(ValueError):
+            self.Form.unpack_many(self.buf * 2, count=3)
+
+    def test_unpack_many_rejects_unknown_kinds(self):
+        with pytest.raises(ValueError):
+            self.Form.unpack_many(self.buf, kind='list')
+
+    def test_iter_unpack_is_lazy(self):
+        records = self.Form.iter_unpack(self.buf * 2, kind='dict')
+        assert next(records) == self.data
+        assert next(records) == self.data
+        with pytest.raises(StopIteration):
+            next(records)
+
+    def test_iter_unpack_accepts_memoryviews(self):
+        buf = memoryview(b'\x01\x00\xff\x02\x00\x7f')
+        records = list(self.TupleForm.iter_unpack(buf, kind='dict'))
+        assert records == [dict(a=1, b=-1), dict(a=2, b=127)]
+
+
+# Pickled forms have to be importable.
+
+class Reading(minform.BinaryForm):
+    f = minform.Float32Field()
+    b = minform.BytesField(max_length=4)
+
+
+class NotedReading(minform.BinaryForm):
+    f = minform.Float32Field()
+    b = minform.BytesField(max_length=4)
+    note = wtforms.StringField()
+
+
+class TestPickling(unittest.TestCase):
+
+    Form = TestBinaryForm.Form
+    data = TestBinaryForm.data
+    buf = TestBinaryForm.buf
+
+    def test_forms_are_pickled_as_packed_bytes(self):
+        form = self.Form(data=self.data)
+        state = form.__reduce__()
+        assert state[1] == (self.Form, self.buf)
+        copy = pickle.loads(pickle.dumps(form))
+        assert type(copy) is self.Form
+        assert copy.data == self.data
+
+    def test_pickles_are_compact(self):
+        form = self.Form(data=self.data)
+        assert len(pickle.dumps(form)) < 200
+
+    def test_unpackable_forms_are_pickled_as_data(self):
+        form = self.Form(data=dict(self.data, int32=2 ** 40))
+        copy = pickle.loads(pickle.dumps(form))
+        assert copy.data['int32'] == 2 ** 40
+
+    def test_copies_keep_the_whole_form(self):
+        import copy
+        form = self.Form(data=dict(self.data, int32=2 ** 40), prefix='p')
+        assert not form.validate()
+        for clone in [copy.copy(form), copy.deepcopy(form)]:
+            assert type(clone) is self.Form
+            assert clone.data == form.data
+            assert clone.int32.name == 'p-int32'
+            assert clone.errors == form.errors
+            assert isinstance(clone.meta, type(form.meta))
+        clone = copy.deepcopy(form)
+        clone.int32.data = 5
+        assert form.int32.data == 2 ** 40
+
+    def test_deep_copies_keep_nested_fields(self):
+        import copy
+
+        class Form(minform.BinaryForm):
+            segment = minform.BinaryFormField(Segment)
+            xs = minform.BinaryFieldList(minform.UInt8Field(), max_entries=3)
+
+        point = {'x': 1, 'y': 2, 'name': b'p'}
+        form = Form(data={'segment': {'start': point, 'end': point},
+                          'xs': [1, 2]}, prefix='f')
+        clone = copy.deepcopy(form)
+        assert clone.data == form.data
+        assert clone.xs.entries[0].name == 'f-xs-0'
+        clone.segment.start.x.data = 7
+        clone.xs.entries[0].data = 7
+        assert form.data['segment']['start']['x'] == 1
+        assert form.data['xs'] == [1, 2]
+        assert clone.pack() != form.pack()
+
+    def test_lossy_forms_are_pickled_as_data(self):
+        for form in [Reading(data={'f': 0.1, 'b': b'ab'}),
+                     Reading(data={'f': 1.0, 'b': b'ab\0'}),
+                     NotedReading(data={'f': 1.0, 'b': b'ab',
+                                        'note': 'hello'})]:
+            assert form.__reduce__()[0] is not minform.core._unpickle_packed
+            copy = pickle.loads(pickle.dumps(form))
+            assert type(copy) is type(form)
+            assert copy.data == form.data
+
+        form = Reading(data={'f': 1.0, 'b': b'ab'})
+        assert form.__reduce__()[0] is minform.core._unpickle_packed
+
+
+class TestBatchPack(unittest.TestCase):
+
+    Form = TestBinaryForm.Form
+    data = TestBinaryForm.data
+    buf = TestBinaryForm.buf
+
+    def test_pack_many_packs_dicts(self):
+        buf = self.Form.pack_many([self.data] * 3)
+        assert isinstance(buf, bytearray)
+        assert buf == self.buf * 3
+
+    def test_pack_many_packs_forms(self):
+        forms = [self.Form(data=self.data) for i in range(2)]
+        assert self.Form.pack_many(forms) == self.buf * 2
+
+    def test_pack_many_packs_generators(self):
+        records = (self.data for i in range(2))
+        assert self.Form.pack_many(records) == self.buf * 2
+
+    def test_pack_many_packs_into_out(self):
+        out = bytearray(len(self.buf) * 3)
+        written = self.Form.pack_many([self.data] * 2, out=out)
+        assert written == len(self.buf) * 2
+        assert out == self.buf * 2 + b'\0' * len(self.buf)
+
+    def test_pack_many_packs_into_memoryview(self):
+        out = bytearray(len(self.buf) + 1)
+        written = self.Form.pack_many([self.data], out=memoryview(out)[1:])
+        assert written == len(self.buf)
+        assert out == b'\0' + self.buf
+
+    def test_pack_many_rejects_small_out(self):
+        out = bytearray(len(self.buf) * 2 - 1)
+        with pytest.raises(ValueError):
+            self.Form.pack_many([self.data] * 2, out=out)
+
+    def test_pack_many_round_trips(self):
+        buf = self.Form.pack_many([self.data] * 4)
+        assert self.Form.unpack_many(buf, kind='dict') == [self.data] * 4
+
+
+class TestStreams(unittest.TestCase):
+
+    class Form(minform.BinaryForm):
+        order = minform.LITTLE_ENDIAN
+
+        a = minform.UInt16Field()
+        b = minform.Int8Field()
+
+    records = [dict(a=i * 100, b=-i) for i in range(10)]
+    buf = b''.join(struct.pack('<Hb', i * 100, -i) for i in range(10))
+
+    class Trickle(object):
+        # A file that only returns a few bytes per read, like a pipe.
+
+        def __init__(self, data, step):
+            self.file = io.BytesIO(data)
+            self.step = step
+
+        def readinto(self, buffer):
+            data = self.file.read(min(self.step, len(buffer)))
+            buffer[:len(data)] = data
+            return len(data)
+
+    class ReadOnly(object):
+
+        def __init__(self, data):
+            self.read = io.BytesIO(data).read
+
+    def test_read_stream_yields_forms(self):
+        forms = list(self.Form.read_stream(io.BytesIO(self.buf)))
+        assert [form.data for form in forms] == self.records
+
+    def test_read_stream_yields_raw_records(self):
+        records = self.Form.read_stream(io.BytesIO(self.buf), kind='dict')
+        assert list(records) == self.records
+        records = self.Form.read_stream(io.BytesIO(self.buf), kind='tuple')
+        assert [record.a for record in records] == [r['a'] for r in
+                                                    self.records]
+
+    def test_records_can_straddle_chunks(self):
+        for step in (1, 2, 4, 7):
+            stream = self.Trickle(self.buf, step)
+            records = self.Form.read_stream(stream, chunk_records=3,
+                                            kind='dict')
+            assert list(records) == self.records
+
+    def test_files_without_readinto_can_be_read(self):
+        records = self.Form.read_stream(self.ReadOnly(self.buf),
+                                        chunk_records=4, kind='dict')
+        assert list(records) == self.records
+
+    def test_truncated_streams_are_flagged(self):
+        records = self.Form.read_stream(io.BytesIO(self.buf[:-1]),
+                                        chunk_records=4, kind='dict')
+        with pytest.raises(ValueError):
+            list(records)
+
+    def test_read_stream_keeps_lazy_lists_valid(self):
+        class Lazy(minform.BinaryForm):
+            entries = minform.BinaryFieldList(minform.UInt8Field(),
+                                              max_entries=2,
+                                              length=minform.FIXED, lazy=True)
+
+        assert Lazy._keeps_buffers and not self.Form._keeps_buffers
+        buf = b''.join(bytes(bytearray([i, i + 1])) for i in range(6))
+        for fileobj in [io.BytesIO(buf), self.Trickle(buf, 3)]:
+            records = list(Lazy.read_stream(fileobj, chunk_records=2,
+                                            kind='dict'))
+            assert [list(record['entries']) for record in records] == \
+                [[i, i + 1] for i in range(6)]
+
+    def test_read_stream_checks_arguments(self):
+        class Empty(minform.BinaryForm):
+            pass
+        with pytest.raises(ValueError):
+            Empty.read_stream(io.BytesIO())
+        with pytest.raises(ValueError):
+            self.Form.read_stream(io.BytesIO(), kind='list')
+
+    def test_write_stream_batches_writes(self):
+        writes = []
+
+        class Recorder(object):
+            def write(self, data):
+                writes.append(bytes(data))
+                return len(data)
+
+        written = self.Form.write_stream(Recorder(), self.records,
+                                         chunk_records=4)
+        assert written == len(self.buf)
+        assert [len(data) for data in writes] == [12, 12, 6]
+        assert b''.join(writes) == self.buf
+
+    def test_write_stream_finishes_short_writes(self):
+        class Slow(object):
+            file = io.BytesIO()
+
+            def write(self, data):
+                return self.file.write(data[:5])
+
+        stream = Slow()
+        forms = [self.Form(data=record) for record in self.records]
+        self.Form.write_stream(stream, forms)
+        assert stream.file.getvalue() == self.buf
+
+    def test_write_stream_raises_when_writes_would_block(self):
+        class Full(io.RawIOBase):
+            file = io.BytesIO()
+
+            def writable(self):
+                return True
+
+            def write(self, data):
+                if self.file.tell() >= 10:
+                    return None
+                return self.file.write(data[:5])
+
+        with pytest.raises(io.BlockingIOError) as info:
+            self.Form.write_stream(Full(), self.records)
+        assert info.value.characters_written == 10
+
+    def test_streams_round_trip_through_files(self):
+        import tempfile
+        with tempfile.TemporaryFile() as f:
+            self.Form.write_stream(f, self.records, chunk_records=3)
+            f.seek(0)
+            assert list(self.Form.read_stream(f, chunk_records=3,
+                                              kind='dict')) == self.records
+
+
+class TestBufferProtocol(unittest.TestCase):
+
+    Form = TestBinaryForm.Form
+    data = TestBinaryForm.data
+    buf = TestBinaryForm.buf
+
+    def test_unpack_accepts_memoryview(self):
+        form = self.Form.unpack(memoryview(self.buf))
+        assert form.data == self.data
+        assert type(form.data['bytes']) is bytes
+
+    def test_unpack_from_accepts_memoryview(self):
+        buf = memoryview(b'\0\0' + self.buf + b'\0')
+        assert self.Form.unpack_from(buf, 2).data == self.data
+
+    def test_unpack_from_accepts_bytearray(self):
+        buf = bytearray(b'\0' + self.buf)
+        assert self.Form.unpack_from(buf, 1).data == self.data
+
+    def test_unpack_from_accepts_mmap(self):
+        import mmap
+        buf = mmap.mmap(-1, self.size + 3)
+        try:
+            buf[3:] = self.buf
+            assert self.Form.unpack_from(buf, 3).data == self.data
+        finally:
+            buf.close()
+
+    def test_pack_into_writes_memoryview(self):
+        out = bytearray(self.size + 2)
+        form = self.Form(data=self.data)
+        form.pack_into(memoryview(out), 1)
+        assert out == b'\0' + self.buf + b'\0'
+
+    def test_pack_into_overwrites_existing_bytes(self):
+        out = bytearray(b'\xff' * self.size)
+        form = self.Form(data=self.data)
+        form.pack_into(out, 0)
+        assert out == self.buf
+
+    size = TestBinaryForm.size
+
+
+class TestNumpy(unittest.TestCase):
+
+    Form = TestBinaryForm.Form
+    data = TestBinaryForm.data
+    buf = TestBinaryForm.buf
+
+    class Nested(minform.BinaryForm):
+        order = minform.LITTLE_ENDIAN
+
+        flag = minform.BinaryBooleanField()
+        inner = minform.BinaryFormField(TestLayout.FixedForm)
+        points = minform.BinaryFieldList(minform.Float32Field(),
+                                         max_entries=2, length=minform.FIXED)
+
+    def setUp(self):
+        self.numpy = pytest.importorskip('numpy')
+
+    def test_dtype_has_form_layout(self):
+        dtype = self.Form.numpy_dtype()
+        assert dtype.itemsize == self.Form.size
+        assert dtype.names == ('char', 'int32', 'bytes', 'lst', 'end', 'lst2')
+        assert dtype.fields['int32'] == (self.numpy.dtype('>i4'), 1)
+        assert dtype.fields['lst'][0].shape == (3,)
+        assert dtype.fields['lst2'][0].names == ('count', 'entries')
+
+    def test_dtype_respects_order(self):
+        dtype = self.Nested.numpy_dtype()
+        assert dtype['points'].base == self.numpy.dtype('<f4')
+        assert dtype['inner']['int32'] == self.numpy.dtype('<i4')
+
+    def test_unpack_array_is_a_view(self):
+        buf = bytearray(self.buf * 3)
+        array = self.Form.unpack_array(buf)
+        assert array.shape == (3,)
+        assert array['int32'].tolist() == [0x12345678] * 3
+        assert array['bytes']['data'][0] == b'foo'
+        assert array['bytes']['length'][0] == 3
+        assert array['lst'][1].tolist() == [1, 2, 3]
+        assert array['end'][2] == b'ab'
+        array['int32'][1] = 1
+        assert self.Form.unpack_from(buf, self.Form.size).data['int32'] == 1
+
+    def test_unpack_array_nested_forms(self):
+        record = dict(flag=True, inner=TestLayout.data, points=[1.5, -2.0])
+        buf = self.Nested(data=record).pack()
+        array = self.Nested.unpack_array(buf)
+        assert array['inner']['auto'][0] == b'cd'
+        assert array['points'][0].tolist() == [1.5, -2.0]
+        assert bool(array['flag'][0])
+
+    def test_unpack_array_respects_count_and_offset(self):
+        array = self.Form.unpack_array(b'\0' + self.buf * 2, count=1,
+                                       offset=1)
+        assert array.shape == (1,)
+
+    def test_unpack_array_rejects_partial_records(self):
+        with pytest.raises(ValueError):
+            self.Form.unpack_array(self.buf + b'\0')
+
+
+class TestColumns(unittest.TestCase):
+
+    Form = TestBinaryForm.Form
+    data = TestBinaryForm.data
+
+    class NumericForm(minform.BinaryForm):
+        a = minform.UInt8Field()
+        b = minform.Int16Field(order=minform.BIG_ENDIAN)
+        c = minform.UInt32Field()
+        _ = minform.BlankBytes(1)
+        d = minform.Float64Field()
+        e = minform.Int64Field(order=minform.NATIVE)
+        f = minform.BinaryBooleanField()
+
+    records = [
+        dict(a=i, b=-i * 300, c=i * 70000, d=i / 4.0, e=-i, f=bool(i % 2))
+        for i in range(5)
+    ]
+
+    def test_numeric_columns_are_arrays(self):
+        import array
+        buf = self.NumericForm.pack_many(self.records,
+                                         order=minform.LITTLE_ENDIAN)
+        columns = self.NumericForm.unpack_columns(buf,
+                                                  order=minform.LITTLE_ENDIAN)
+        for name in 'abcde':
+            assert isinstance(columns[name], array.array)
+            assert list(columns[name]) == [r[name] for r in self.records]
+        assert columns['f'] == [r['f'] for r in self.records]
+        assert '_' not in columns
+
+    def test_columns_are_byteswapped(self):
+        buf = self.NumericForm.pack_many(self.records,
+                                         order=minform.BIG_ENDIAN)
+        columns = self.NumericForm.unpack_columns(buf,
+                                                  order=minform.BIG_ENDIAN)
+        assert list(columns['c']) == [r['c'] for r in self.records]
+        assert list(columns['d']) == [r['d'] for r in self.records]
+
+    def test_other_fields_are_lists(self):
+        buf = self.Form.pack_many([self.data] * 2)
+        columns = self.Form.unpack_columns(buf)
+        assert list(columns['int32']) == [0x12345678] * 2
+        assert columns['char'] == [b'\x10'] * 2
+        assert columns['bytes'] == [b'foo'] * 2
+        assert columns['lst'] == [[1, 2, 3]] * 2
+
+    def test_columns_respect_count_and_offset(self):
+        buf = b'\0' + self.NumericForm.pack_many(self.records)
+        columns = self.NumericForm.unpack_columns(buf, count=2, offset=1)
+        assert list(columns['c']) == [0, 70000]
+
+    def test_columns_reject_partial_records(self):
+        with pytest.raises(ValueError):
+            self.NumericForm.unpack_columns(b'\0' * 10)
+
+    def test_pack_columns_round_trips(self):
+        columns = dict((name, [r[name] for r in self.records])
+                       for name in 'abcdef')
+        for order in minform.core.BYTE_ORDERS:
+            buf = self.NumericForm.pack_columns(columns, order=order)
+            assert buf == self.NumericForm.pack_many(self.records,
+                                                     order=order)
+
+    def test_pack_columns_accepts_arrays(self):
+        import array
+        columns = self.NumericForm.unpack_columns(
+            self.NumericForm.pack_many(self.records))
+        columns['c'] = array.array('L', columns['c'])
+        buf = self.NumericForm.pack_columns(columns)
+        assert buf == self.NumericForm.pack_many(self.records)
+
+    def test_pack_columns_accepts_numpy_arrays(self):
+        numpy = pytest.importorskip('numpy')
+        columns = dict((name, numpy.array([r[name] for r in self.records]))
+                       for name in 'abcdef')
+        buf = self.NumericForm.pack_columns(columns,
+                                            order=minform.BIG_ENDIAN)
+        assert buf == self.NumericForm.pack_many(self.records,
+                                                 order=minform.BIG_ENDIAN)
+
+    def test_pack_columns_checks_numpy_values(self):
+        numpy = pytest.importorskip('numpy')
+        columns = dict((name, numpy.array([r[name] for r in self.records]))
+                       for name in 'abcdef')
+        for bad, error in [([300, 1, 2, 3, 4], OverflowError),
+                           ([-1, 1, 2, 3, 4], OverflowError),
+                           ([2.7, 1, 2, 3, 4], TypeError)]:
+            with pytest.raises(error):
+                self.NumericForm.pack_columns(dict(columns, a=bad))
+            with pytest.raises(error):
+                self.NumericForm.pack_columns(
+                    dict(columns, a=numpy.array(bad)))
+
+    def test_pack_columns_packs_other_fields(self):
+        columns = dict((name, [value] * 3)
+                       for name, value in self.data.items())
+        assert self.Form.pack_columns(columns) == self.Form.pack_many(
+            [self.data] * 3)
+
+    def test_pack_columns_into_out(self):
+        columns = dict((name, [r[name] for r in self.records])
+                       for name in 'abcdef')
+        size = self.NumericForm.size
+        out = bytearray(b'\xff' * (size * 6))
+        written = self.NumericForm.pack_columns(columns, out=out)
+        assert written == size * 5
+        assert out[:written] == self.NumericForm.pack_many(self.records)
+        assert out[written:] == b'\xff' * size
+        with pytest.raises(ValueError):
+            self.NumericForm.pack_columns(columns, out=out[:-size - 1])
+
+    def test_pack_columns_checks_columns(self):
+        columns = dict((name, [r[name] for r in self.records])
+                       for name in 'abcdef')
+        for bad in [dict(columns, g=[]), dict(columns, a=[1])]:
+            with pytest.raises(ValueError):
+                self.NumericForm.pack_columns(bad)
+        del columns['a']
+        with pytest.raises(ValueError):
+            self.NumericForm.pack_columns(columns)
+
+
+class TestThreadSafety(unittest.TestCase):
+
+    threads = 8
+
+    def setUp(self):
+        # Switch threads as often as possible, to give races a chance.
+        self.interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.interval)
+
+    def run_threads(self, target):
+        # Start every thread at once, and collect what each returns.
+        barrier = threading.Barrier(self.threads)
+        results = [None] * self.threads
+        errors = []
+
+        def run(i):
+            try:
+                barrier.wait()
+                results[i] = target()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run, args=(i,))
+                   for i in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        return results
+
+    def test_items_get_unique_creation_ids(self):
+        results = self.run_threads(
+            lambda: [minform.UInt8Field()._creation_id
+                     for i in range(1000)])
+        ids = [i for result in results for i in result]
+        assert len(set(ids)) == len(ids)
+        for result in results:
+            assert result == sorted(result)
+
+    def test_forms_defined_in_threads_keep_field_order(self):
+        names = ['f{0}'.format(i) for i in range(20)]
+
+        def define():
+            forms = []
+            for i in range(20):
+                attrs = dict((name, minform.UInt8Field()) for name in names)
+                forms.append(type('Form', (minform.BinaryForm,), attrs))
+            return forms
+
+        for forms in self.run_threads(define):
+            for form_class in forms:
+                assert [item.name for item in form_class._binary_items] == \
+                    names
+
+    def make_form(self):
+        class Form(minform.BinaryForm):
+            a = minform.UInt32Field()
+            b = minform.BinaryFormField(Point)
+            c = minform.BinaryFieldList(minform.Int16Field(), max_entries=4,
+                                        length=minform.FIXED)
+        return Form
+
+    def test_caches_are_populated_once(self):
+        for i in range(10):
+            Form = self.make_form()
+            results = self.run_threads(lambda: (
+                Form.codec(), Form.codec(minform.BIG_ENDIAN),
+                Form._layout(minform.BIG_ENDIAN), Form.record_type(),
+                Form.projection(['a', 'c']),
+                type(Form.view(bytearray(Form.size)))))
+            for result in results[1:]:
+                for first, other in zip(results[0], result):
+                    assert first is other
+
+    def test_records_round_trip_in_threads(self):
+        Form = self.make_form()
+
+        def round_trip():
+            records = [dict(a=i, c=[i % 100, -1, 0, 1],
+                            b=dict(x=i % 128, y=-(i % 128), name=b'ab'))
+                       for i in range(500)]
+            buf = Form.pack_many(records, order=minform.BIG_ENDIAN)
+            return Form.unpack_many(buf, order=minform.BIG_ENDIAN,
+                                    kind='dict') == records
+
+        assert all(self.run_threads(round_trip))
@@ -0,0 +1,191 @@
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import pytest
+import minform
+
+
+class Tick(minform.BinaryForm):
+    order = minform.LITTLE_ENDIAN
+
+    time = minform.UInt32Field()
+    price = minform.Float64Field()
+
+
+ticks = [dict(time=i, price=i / 8.0) for i in range(50)]
+buf = b''.join(struct.pack('<Id', i, i / 8.0) for i in range(50))
+
+
+class FileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'records.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, data):
+        with open(self.path, 'wb') as f:
+            f.write(data)
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+
+class TestRecordFile(FileTest):
+
+    def setUp(self):
+        super(TestRecordFile, self).setUp()
+        self.write(buf)
+
+    def test_records_can_be_indexed(self):
+        with minform.RecordFile(self.path, Tick, kind='dict') as f:
+            assert len(f) == 50
+            assert f[0] == ticks[0]
+            assert f[17] == ticks[17]
+            assert f[-1] == ticks[-1]
+            with pytest.raises(IndexError):
+                f[50]
+
+    def test_records_can_be_sliced(self):
+        with minform.RecordFile(self.path, Tick, kind='dict') as f:
+            assert f[10:20:3] == ticks[10:20:3]
+            assert f[-2:] == ticks[-2:]
+
+    def test_records_can_be_iterated(self):
+        with minform.RecordFile(self.path, Tick) as f:
+            assert [form.data for form in f] == ticks
+
+    def test_iteration_restores_normal_paging(self):
+        import mmap
+        if not hasattr(mmap.mmap, 'madvise'):
+            pytest.skip('mmap.madvise is not available')
+
+        advice = []
+
+        class Recording(mmap.mmap):
+            def madvise(self, option, *args):
+                advice.append(option)
+                return super(Recording, self).madvise(option, *args)
+
+        with minform.RecordFile(self.path, Tick, kind='dict') as f:
+            f._map.close()
+            f._map = Recording(f._file.fileno(), len(buf),
+                               access=mmap.ACCESS_READ)
+            assert list(f) == ticks
+            assert advice == [mmap.MADV_SEQUENTIAL, mmap.MADV_NORMAL]
+
+            del advice[:]
+            records = iter(f)
+            next(records)
+            records.close()
+            assert advice == [mmap.MADV_SEQUENTIAL, mmap.MADV_NORMAL]
+
+    def test_records_can_be_viewed(self):
+        with minform.RecordFile(self.path, Tick) as f:
+            assert f.view(3).price == ticks[3]['price']
+
+    def test_records_can_be_replaced_in_place(self):
+        with minform.RecordFile(self.path, Tick, mode='r+') as f:
+            f[1] = dict(time=100, price=1.5)
+            f[2] = Tick(time=200, price=2.5)
+            f.view(3).time = 300
+        data = self.read()
+        assert len(data) == len(buf)
+        assert data[12:48] == struct.pack('<Id', 100, 1.5) + struct.pack(
+            '<Id', 200, 2.5) + struct.pack('<Id', 300, ticks[3]['price'])
+
+    def test_read_only_files_cannot_be_changed(self):
+        with minform.RecordFile(self.path, Tick) as f:
+            with pytest.raises(TypeError):
+                f[0] = ticks[1]
+            with pytest.raises(TypeError):
+                f.append(ticks[1])
+
+    def test_records_can_be_appended(self):
+        with minform.RecordFile(self.path, Tick, mode='a',
+                                kind='dict') as f:
+            f.append(ticks[0])
+            assert len(f) == 51
+            f.extend(ticks[1:3])
+            assert f[-3:] == ticks[:3]
+        assert self.read() == buf + buf[:36]
+
+    def test_partial_records_are_rejected(self):
+        self.write(buf[:-1])
+        with pytest.raises(ValueError):
+            minform.RecordFile(self.path, Tick)
+
+    def test_empty_files(self):
+        self.write(b'')
+        with minform.RecordFile(self.path, Tick, mode='a',
+                                kind='dict') as f:
+            assert len(f) == 0
+            assert list(f) == []
+            f.append(ticks[5])
+            assert list(f) == [ticks[5]]
+
+    def test_unknown_modes_are_rejected(self):
+        with pytest.raises(ValueError):
+            minform.RecordFile(self.path, Tick, mode='w')
+
+
+class TestRecordLog(FileTest):
+
+    def setUp(self):
+        super(TestRecordLog, self).setUp()
+        self.syncs = []
+        self.real_fsync = os.fsync
+        os.fsync = self.syncs.append
+
+    def tearDown(self):
+        os.fsync = self.real_fsync
+        super(TestRecordLog, self).tearDown()
+
+    def test_records_are_written_in_batches(self):
+        log = minform.RecordLog(self.path, Tick, buffer_records=8,
+                                sync_interval=None)
+        log.extend(ticks[:20])
+        assert self.read() == buf[:16 * Tick.size]
+        log.flush()
+        assert self.read() == buf[:20 * Tick.size]
+        log.close()
+        assert len(self.syncs) == 1
+
+    def test_sync_by_record_count(self):
+        with minform.RecordLog(self.path, Tick, sync_records=10,
+                               sync_interval=None) as log:
+            log.extend(ticks[:25])
+            assert len(self.syncs) == 2
+            assert self.read() == buf[:20 * Tick.size]
+        assert len(self.syncs) == 3
+        assert self.read() == buf[:25 * Tick.size]
+
+    def test_sync_by_interval(self):
+        with minform.RecordLog(self.path, Tick, sync_interval=0) as log:
+            log.append(ticks[0])
+            log.append(Tick(data=ticks[1]))
+            assert len(self.syncs) == 2
+            assert self.read() == buf[:2 * Tick.size]
+        with minform.RecordLog(self.path, Tick, sync_interval=3600) as log:
+            log.extend(ticks[2:])
+            assert len(self.syncs) == 3
+        assert self.read() == buf
+
+    def test_partial_tail_is_truncated(self):
+        self.write(buf[:3 * Tick.size + 5])
+        with minform.RecordLog(self.path, Tick) as log:
+            assert log.truncated == 5
+            log.append(ticks[3])
+        assert self.read() == buf[:4 * Tick.size]
+
+    def test_whole_records_are_kept(self):
+        self.write(buf[:3 * Tick.size])
+        with minform.RecordLog(self.path, Tick) as log:
+            assert log.truncated == 0
+        assert self.read() == buf[:3 * Tick.size]
@@ -0,0 +1,74 @@
+import operator
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+import minform
+import minform.parallel
+
+
+class Sample(minform.BinaryForm):
+    order = minform.BIG_ENDIAN
+
+    channel = minform.UInt8Field()
+    value = minform.Int32Field()
+
+
+samples = [dict(channel=i % 4, value=i * 3 - 100) for i in range(1000)]
+
+
+def value(record):
+    return record['value']
+
+
+class TestUnpackFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'samples.bin')
+        with open(self.path, 'wb') as f:
+            f.write(Sample.pack_many(samples))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_ranges_are_record_aligned(self):
+        ranges = list(minform.parallel._ranges(10, 4))
+        assert ranges == [(0, 3), (3, 6), (6, 8), (8, 10)]
+        assert list(minform.parallel._ranges(2, 4)) == [(0, 1), (1, 2)]
+
+    def test_records_are_unpacked_in_order(self):
+        records = minform.parallel.unpack_file(self.path, Sample, workers=2)
+        assert records == samples
+
+    def test_records_are_mapped_and_reduced(self):
+        total = minform.parallel.unpack_file(self.path, Sample, workers=3,
+                                             mapper=value,
+                                             reducer=operator.add)
+        assert total == sum(record['value'] for record in samples)
+
+    def test_records_are_mapped(self):
+        values = minform.parallel.unpack_file(self.path, Sample, workers=2,
+                                              mapper=value)
+        assert values == [record['value'] for record in samples]
+
+    def test_ranges_past_the_first_page(self):
+        # Most ranges start partway through a page of the file.
+        with open(self.path, 'ab') as f:
+            f.write(Sample.pack_many(samples * 4))
+        records = minform.parallel.unpack_file(self.path, Sample, workers=3)
+        assert records == samples * 5
+
+    def test_empty_files(self):
+        open(self.path, 'wb').close()
+        assert minform.parallel.unpack_file(self.path, Sample) == []
+        assert minform.parallel.unpack_file(self.path, Sample,
+                                            reducer=operator.add) is None
+
+    def test_partial_records_are_rejected(self):
+        with open(self.path, 'ab') as f:
+            f.write(b'\0')
+        with pytest.raises(ValueError):
+            minform.parallel.unpack_file(self.path, Sample)
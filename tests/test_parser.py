@@ -0,0 +1,123 @@
+import struct
+import unittest
+
+import pytest
+import minform
+
+
+class Reading(minform.BinaryForm):
+    order = minform.BIG_ENDIAN
+
+    sensor = minform.UInt16Field()
+    value = minform.Int32Field()
+
+
+class Alarm(minform.BinaryForm):
+    level = minform.UInt8Field()
+
+
+readings = [dict(sensor=i, value=-i * 1000) for i in range(20)]
+buf = b''.join(struct.pack('>Hi', i, -i * 1000) for i in range(20))
+
+
+def chunks(data, step):
+    return [data[i:i + step] for i in range(0, len(data), step)]
+
+
+class TestParser(unittest.TestCase):
+
+    def test_whole_records_are_returned(self):
+        parser = minform.Parser(Reading, kind='dict')
+        assert parser.feed(buf) == readings
+        assert parser.pending == 0
+
+    def test_partial_records_are_kept(self):
+        for step in (1, 4, 6, 7, 50):
+            parser = minform.Parser(Reading, kind='dict')
+            records = []
+            for chunk in chunks(buf, step):
+                records.extend(parser.feed(chunk))
+            assert records == readings
+            parser.close()
+
+    def test_pending_bytes(self):
+        parser = minform.Parser(Reading, kind='dict')
+        assert parser.feed(buf[:10]) == readings[:1]
+        assert parser.pending == 4
+        assert parser.feed(buf[10:11]) == []
+        assert parser.pending == 5
+        with pytest.raises(ValueError):
+            parser.close()
+
+    def test_buffer_is_reused(self):
+        parser = minform.Parser(Reading, kind='dict')
+        buffer = parser._buffer
+        for chunk in chunks(buf * 10, 5):
+            parser.feed(chunk)
+        assert parser._buffer is buffer
+        assert len(buffer) < 2 * Reading.size
+
+    def test_record_kinds(self):
+        forms = minform.Parser(Reading).feed(buf[:6])
+        assert forms[0].data == readings[0]
+        tuples = minform.Parser(Reading, kind='tuple').feed(buf[:6])
+        assert tuples == [(0, 0)]
+        with pytest.raises(ValueError):
+            minform.Parser(Reading, kind='list')
+
+    def test_memoryviews_can_be_fed(self):
+        parser = minform.Parser(Reading, kind='dict')
+        view = memoryview(bytearray(buf))
+        assert parser.feed(view[:9]) + parser.feed(view[9:]) == readings
+
+    def test_lazy_lists_stay_valid(self):
+        class Lazy(minform.BinaryForm):
+            entries = minform.BinaryFieldList(minform.UInt8Field(),
+                                              max_entries=2,
+                                              length=minform.FIXED, lazy=True)
+
+        parser = minform.Parser(Lazy, kind='dict')
+        data = bytearray(b''.join(bytes(bytearray([i, i + 1]))
+                                  for i in range(6)))
+        records = []
+        for chunk in chunks(data, 3):
+            fed = bytearray(chunk)
+            records.extend(parser.feed(fed))
+            fed[:] = b'\xff' * len(fed)
+        assert [list(record['entries']) for record in records] == \
+            [[i, i + 1] for i in range(6)]
+
+
+class TestPrefixParser(unittest.TestCase):
+
+    forms = {1: Reading, 2: Alarm}
+    data = (b'\x01' + struct.pack('>Hi', 5, -7) +
+            b'\x02\x09' +
+            b'\x01' + struct.pack('>Hi', 6, 8))
+    records = [(1, dict(sensor=5, value=-7)), (2, dict(level=9)),
+               (1, dict(sensor=6, value=8))]
+
+    def parser(self):
+        return minform.Parser(self.forms, prefix=minform.UInt8Field(),
+                              kind='dict')
+
+    def test_records_are_dispatched_on_type(self):
+        assert self.parser().feed(self.data) == self.records
+
+    def test_partial_records_are_kept(self):
+        for step in (1, 2, 3, 5):
+            parser = self.parser()
+            records = []
+            for chunk in chunks(self.data, step):
+                records.extend(parser.feed(chunk))
+            assert records == self.records
+
+    def test_unknown_types_are_rejected(self):
+        with pytest.raises(ValueError):
+            self.parser().feed(b'\x03\0\0')
+
+    def test_prefix_needs_forms(self):
+        with pytest.raises(ValueError):
+            minform.Parser(self.forms)
+        with pytest.raises(ValueError):
+            minform.Parser(Reading, prefix=minform.UInt8Field())
@@ -0,0 +1,92 @@
+import pytest
+import unittest
+import minform
+
+
+class Inner(minform.BinaryForm):
+    x = minform.UInt16Field()
+    y = minform.BytesField(max_length=4, length=minform.AUTOMATIC)
+
+
+class Outer(minform.BinaryForm):
+    order = minform.BIG_ENDIAN
+
+    key = minform.UInt32Field()
+    _ = minform.BlankBytes(1)
+    inner = minform.BinaryFormField(Inner, order=minform.LITTLE_ENDIAN)
+    samples = minform.BinaryFieldList(minform.Int16Field(), max_entries=4,
+                                      length=minform.EXPLICIT)
+    pairs = minform.BinaryFieldList(minform.BinaryFormField(Inner),
+                                    max_entries=3, length=minform.FIXED)
+
+
+class TestProjection(unittest.TestCase):
+
+    data = {
+        'key': 0xdeadbeef,
+        'inner': {'x': 0x0102, 'y': b'ab'},
+        'samples': [1, -2, 3],
+        'pairs': [
+            {'x': 1, 'y': b'c'},
+            {'x': 2, 'y': b'dd'},
+            {'x': 3, 'y': b''},
+        ],
+    }
+
+    def setUp(self):
+        self.buf = Outer(data=self.data).pack()
+
+    def project(self, *fields):
+        return Outer.project(self.buf, list(fields))
+
+    def test_top_level_fields(self):
+        assert self.project('key') == {'key': 0xdeadbeef}
+
+    def test_single_path_string(self):
+        assert Outer.project(self.buf, 'key') == {'key': 0xdeadbeef}
+
+    def test_nested_fields_respect_order(self):
+        assert self.project('inner.x') == {'inner.x': 0x0102}
+
+    def test_nested_forms(self):
+        assert self.project('inner') == {'inner': self.data['inner']}
+
+    def test_list_indexes(self):
+        assert self.project('samples[1]', 'samples[-1]', 'pairs[-1].x') == {
+            'samples[1]': -2,
+            'samples[-1]': 3,
+            'pairs[-1].x': 3,
+        }
+
+    def test_list_ranges(self):
+        assert self.project('samples[1:]', 'pairs[::2].y') == {
+            'samples[1:]': [-2, 3],
+            'pairs[::2].y': [b'c', b''],
+        }
+
+    def test_explicit_list_indexes_are_checked(self):
+        with pytest.raises(IndexError):
+            self.project('samples[3]')
+
+    def test_fixed_list_indexes_are_checked_when_compiled(self):
+        with pytest.raises(ValueError):
+            Outer.projection(['pairs[3]'])
+
+    def test_unknown_fields_are_rejected(self):
+        for path in ['nope', 'key.x', 'inner[0]', 'key[0]', 'inner.z',
+                     '.key', 'key..x', 'samples[a]']:
+            with pytest.raises(ValueError):
+                Outer.projection([path])
+
+    def test_projection_at_offset(self):
+        buf = b'\0\0\0' + self.buf
+        assert Outer.project(buf, ['key'], 3) == {'key': 0xdeadbeef}
+
+    def test_project_checks_size(self):
+        with pytest.raises(ValueError):
+            Outer.project(self.buf[1:], ['key'])
+
+    def test_projections_are_cached(self):
+        projection = Outer.projection(['key', 'inner.y'])
+        assert Outer.projection(('key', 'inner.y')) is projection
+        assert Outer.projection(['key']) is not projection
@@ -0,0 +1,182 @@
+import multiprocessing
+import pickle
+import unittest
+
+import pytest
+import minform
+
+pytest.importorskip('multiprocessing.shared_memory')
+
+
+class Quote(minform.BinaryForm):
+    symbol = minform.BytesField(max_length=4, length=minform.AUTOMATIC)
+    price = minform.Float64Field()
+
+
+quotes = [dict(symbol=b'Q' + str(i).encode(), price=i + 0.5)
+          for i in range(100)]
+
+
+def produce(table):
+    for quote in quotes:
+        while not table.put(quote):
+            pass
+    table.close()
+
+
+def echo(requests, responses):
+    batch = requests.get()
+    while batch:
+        responses.put(batch)
+        batch = requests.get()
+    responses.put([])
+
+
+def double_prices(table):
+    for i in range(len(table)):
+        table.view(i).price *= 2
+    table.close()
+
+
+class Samples(minform.BinaryForm):
+    xs = minform.BinaryFieldList(minform.UInt8Field(), max_entries=3,
+                                 lazy=True)
+
+
+class TestSharedTable(unittest.TestCase):
+
+    def setUp(self):
+        self.table = minform.SharedTable(Quote, 8)
+
+    def tearDown(self):
+        self.table.close()
+        self.table.unlink()
+
+    def test_slots_can_be_set_and_read(self):
+        self.table[0] = quotes[0]
+        self.table[-1] = Quote(data=quotes[1])
+        assert self.table[0] == quotes[0]
+        assert self.table[7] == quotes[1]
+        assert self.table[::7] == [quotes[0], quotes[1]]
+        assert len(self.table) == 8
+        with pytest.raises(IndexError):
+            self.table[8]
+
+    def test_slots_can_be_viewed(self):
+        self.table[2] = quotes[2]
+        view = self.table.view(2)
+        assert view.symbol == quotes[2]['symbol']
+        view.price = 9.0
+        assert self.table[2]['price'] == 9.0
+
+    def test_tables_can_be_attached_by_name(self):
+        self.table[3] = quotes[3]
+        other = minform.SharedTable(Quote, 8, name=self.table.name,
+                                    create=False)
+        try:
+            assert other[3] == quotes[3]
+        finally:
+            other.close()
+        copy = pickle.loads(pickle.dumps(self.table))
+        try:
+            assert copy.name == self.table.name
+            assert copy[3] == quotes[3]
+        finally:
+            copy.close()
+
+    def test_queue_is_first_in_first_out(self):
+        assert self.table.get() is None
+        for quote in quotes[:8]:
+            assert self.table.put(quote)
+        assert not self.table.put(quotes[8])
+        assert self.table.queued == 8
+        assert self.table.get() == quotes[0]
+        assert self.table.put(quotes[8])
+        assert [self.table.get() for i in range(8)] == quotes[1:9]
+        assert self.table.get() is None
+        assert self.table.queued == 0
+
+    def test_lazy_records_outlive_their_slots(self):
+        table = minform.SharedTable(Samples, 1)
+        try:
+            table.put({'xs': [1, 2, 3]})
+            record = table.get()
+            table[0] = {'xs': [4]}
+            slot = table[0]
+            table.put({'xs': [9]})
+            assert list(record['xs']) == [1, 2, 3]
+            assert list(slot['xs']) == [4]
+        finally:
+            table.close()
+            table.unlink()
+
+    def test_queue_between_processes(self):
+        producer = multiprocessing.Process(target=produce,
+                                           args=(self.table,))
+        producer.start()
+        received = []
+        while len(received) < len(quotes):
+            quote = self.table.get()
+            if quote is not None:
+                received.append(quote)
+        producer.join()
+        assert received == quotes
+
+    def test_queue_with_a_lock(self):
+        lock = multiprocessing.Lock()
+        table = minform.SharedTable(Quote, 8, lock=lock)
+        try:
+            producer = multiprocessing.Process(target=produce,
+                                               args=(table,))
+            producer.start()
+            received = []
+            while len(received) < len(quotes):
+                quote = table.get()
+                if quote is not None:
+                    received.append(quote)
+            producer.join()
+            assert received == quotes
+        finally:
+            table.close()
+            table.unlink()
+
+    def test_slots_are_shared_between_processes(self):
+        for i in range(8):
+            self.table[i] = quotes[i]
+        worker = multiprocessing.Process(target=double_prices,
+                                         args=(self.table,))
+        worker.start()
+        worker.join()
+        assert [quote['price'] for quote in self.table] == [
+            quote['price'] * 2 for quote in quotes[:8]]
+
+
+class TestRecordQueue(unittest.TestCase):
+
+    def test_batches_are_packed(self):
+        queue = minform.RecordQueue(Quote, queue=multiprocessing.Queue())
+        queue.put(quotes[:3])
+        buffer = queue.queue.get()
+        assert buffer == bytes(Quote.pack_many(quotes[:3]))
+
+    def test_batches_are_unpacked(self):
+        queue = minform.RecordQueue(Quote, kind='form')
+        queue.put([Quote(data=quote) for quote in quotes[:2]])
+        assert [form.data for form in queue.get()] == quotes[:2]
+
+    def test_batches_between_processes(self):
+        requests = minform.RecordQueue(Quote)
+        responses = minform.RecordQueue(Quote)
+        worker = multiprocessing.Process(target=echo,
+                                         args=(requests, responses))
+        worker.start()
+        for i in range(0, 100, 25):
+            requests.put(quotes[i:i + 25])
+        requests.put([])
+        received = []
+        batch = responses.get()
+        while batch:
+            received.extend(batch)
+            batch = responses.get()
+        worker.join()
+        assert received == quotes
@@ -0,0 +1,259 @@
+import pytest
+import unittest
+import minform
+
+
+class Inner(minform.BinaryForm):
+    x = minform.UInt16Field()
+    y = minform.BytesField(max_length=4, length=minform.AUTOMATIC)
+
+
+class Outer(minform.BinaryForm):
+    order = minform.BIG_ENDIAN
+
+    key = minform.UInt32Field()
+    _ = minform.BlankBytes(1)
+    inner = minform.BinaryFormField(Inner)
+    samples = minform.BinaryFieldList(minform.Int16Field(), max_entries=4,
+                                      length=minform.EXPLICIT)
+    pairs = minform.BinaryFieldList(minform.BinaryFormField(Inner),
+                                    max_entries=2, length=minform.FIXED)
+
+
+class TestRecordView(unittest.TestCase):
+
+    data = {
+        'key': 0xdeadbeef,
+        'inner': {'x': 7, 'y': b'ab'},
+        'samples': [1, -2, 3],
+        'pairs': [{'x': 1, 'y': b'c'}, {'x': 2, 'y': b'dd'}],
+    }
+
+    def setUp(self):
+        self.buf = Outer(data=self.data).pack()
+
+    def test_fields_are_decoded(self):
+        view = Outer.view(self.buf)
+        assert view.key == 0xdeadbeef
+        assert view['key'] == 0xdeadbeef
+
+    def test_unknown_fields_raise_key_error(self):
+        view = Outer.view(self.buf)
+        with pytest.raises(KeyError):
+            view['nope']
+
+    def test_fields_are_decoded_lazily_and_memoized(self):
+        buf = bytearray(self.buf)
+        view = Outer.view(buf)
+        assert view._cache == {}
+        assert view.key == 0xdeadbeef
+        assert list(view._cache) == ['key']
+        buf[0] = 0
+        assert view.key == 0xdeadbeef
+
+    def test_nested_forms_are_views(self):
+        view = Outer.view(self.buf)
+        assert isinstance(view.inner, minform.views.RecordView)
+        assert view.inner.x == 7
+        assert view.inner.y == b'ab'
+
+    def test_lists_are_list_views(self):
+        view = Outer.view(self.buf)
+        assert isinstance(view.samples, minform.views.ListView)
+        assert len(view.samples) == 3
+        assert view.samples == [1, -2, 3]
+        assert view.samples[-1] == 3
+
+    def test_lists_of_forms_are_views(self):
+        view = Outer.view(self.buf)
+        assert len(view.pairs) == 2
+        assert view.pairs[1].y == b'dd'
+
+    def test_view_at_offset(self):
+        view = Outer.view(b'\0\0' + self.buf, 2)
+        assert view.inner.x == 7
+
+    def test_view_checks_size(self):
+        with pytest.raises(ValueError):
+            Outer.view(self.buf[:-1])
+
+    def test_view_can_be_decoded_as_dict(self):
+        assert Outer.view(self.buf)._asdict() == self.data
+
+    def test_view_class_is_per_form(self):
+        assert type(Outer.view(self.buf)) is type(Outer.view(self.buf))
+        assert type(Outer.view(self.buf)).__name__ == 'OuterView'
+
+
+class TestListView(unittest.TestCase):
+
+    class Form(minform.BinaryForm):
+        values = minform.BinaryFieldList(minform.UInt8Field(), max_entries=6,
+                                         length=minform.EXPLICIT)
+
+    def setUp(self):
+        self.buf = self.Form(values=[1, 2, 3, 4, 5]).pack()
+        self.values = self.Form.view(self.buf).values
+
+    def test_slices_are_views(self):
+        part = self.values[1:4]
+        assert isinstance(part, minform.views.ListView)
+        assert part == [2, 3, 4]
+
+    def test_slices_with_steps(self):
+        assert self.values[::2] == [1, 3, 5]
+        assert self.values[::-2] == [5, 3, 1]
+        assert self.values[3:0:-1][1:] == [3, 2]
+
+    def test_index_out_of_range(self):
+        with pytest.raises(IndexError):
+            self.values[5]
+
+    def test_unreasonable_count_is_flagged(self):
+        buf = b'\x07' + self.buf[1:]
+        with pytest.raises(ValueError):
+            len(self.Form.view(buf).values)
+
+
+class TestLazyList(unittest.TestCase):
+
+    class Form(minform.BinaryForm):
+        order = minform.LITTLE_ENDIAN
+
+        values = minform.BinaryFieldList(minform.UInt16Field(),
+                                         max_entries=1000, lazy=True)
+        inners = minform.BinaryFieldList(minform.BinaryFormField(Inner),
+                                         max_entries=2, length=minform.FIXED,
+                                         lazy=True)
+
+    data = {
+        'values': list(range(0, 3000, 3)),
+        'inners': [{'x': 1, 'y': b'c'}, {'x': 2, 'y': b'dd'}],
+    }
+
+    def setUp(self):
+        self.buf = self.Form(data=self.data).pack()
+        self.unpacked = self.Form.unpack_dict(self.buf)
+
+    def test_lazy_lists_are_read_only_views(self):
+        values = self.unpacked['values']
+        assert isinstance(values, minform.views.ReadOnlyListView)
+        assert len(values) == 1000
+        assert values == self.data['values']
+        with pytest.raises(TypeError):
+            values[0] = 1
+
+    def test_entries_are_unpacked(self):
+        inners = self.unpacked['inners']
+        assert inners[1] == {'x': 2, 'y': b'dd'}
+        assert list(inners) == self.data['inners']
+
+    def test_slices_are_read_only_views(self):
+        part = self.unpacked['values'][10:20:5]
+        assert isinstance(part, minform.views.ReadOnlyListView)
+        assert part == [30, 45]
+        with pytest.raises(TypeError):
+            part[0] = 1
+
+    def test_length_comes_from_count(self):
+        buf = self.Form(values=[5, 6], inners=self.data['inners']).pack()
+        values = self.Form.unpack_dict(buf)['values']
+        assert len(values) == 2
+        assert values == [5, 6]
+
+    def test_unreasonable_count_is_flagged_on_unpack(self):
+        buf = b'\xe9\x03' + self.buf[2:]
+        with pytest.raises(ValueError):
+            self.Form.unpack_dict(buf)
+
+    def test_lazy_lists_can_be_packed(self):
+        assert self.Form(data=self.unpacked).pack() == self.buf
+
+
+class TestWritableView(unittest.TestCase):
+
+    class Form(minform.BinaryForm):
+        order = minform.BIG_ENDIAN
+
+        seq = minform.UInt16Field()
+        checksum = minform.UInt16Field(order=minform.LITTLE_ENDIAN)
+        name = minform.BytesField(max_length=4, length=minform.AUTOMATIC)
+        inner = minform.BinaryFormField(Inner, order=minform.LITTLE_ENDIAN)
+        values = minform.BinaryFieldList(minform.UInt8Field(), max_entries=3,
+                                         length=minform.EXPLICIT)
+
+    data = {
+        'seq': 1,
+        'checksum': 2,
+        'name': b'ab',
+        'inner': {'x': 3, 'y': b'z'},
+        'values': [4, 5],
+    }
+
+    def setUp(self):
+        self.buf = bytearray(b'\xff' + self.Form(data=self.data).pack())
+        self.view = self.Form.view(self.buf, 1)
+
+    def unpacked(self):
+        return self.Form.unpack_from(self.buf, 1).data
+
+    def test_setting_a_field_packs_it_in_place(self):
+        self.view.seq = 0x1234
+        assert self.buf[1:3] == b'\x12\x34'
+        assert self.view.seq == 0x1234
+        assert self.unpacked() == dict(self.data, seq=0x1234)
+
+    def test_setting_respects_item_order(self):
+        self.view.checksum = 0x1234
+        assert self.buf[3:5] == b'\x34\x12'
+
+    def test_setting_by_name(self):
+        self.view['name'] = b'xyz'
+        assert self.view.name == b'xyz'
+        assert self.buf[0] == 0xff
+
+    def test_setting_refreshes_memoized_values(self):
+        assert self.view.name == b'ab'
+        self.view.name = b'q\0'
+        assert self.view.name == b'q'
+
+    def test_setting_nested_fields(self):
+        self.view.inner.x = 0x0102
+        assert self.unpacked()['inner'] == {'x': 0x0102, 'y': b'z'}
+
+    def test_setting_nested_forms(self):
+        self.view.inner = {'x': 9, 'y': b'w'}
+        assert self.view.inner.x == 9
+        assert self.unpacked()['inner'] == {'x': 9, 'y': b'w'}
+
+    def test_setting_list_entries(self):
+        self.view.values[1] = 6
+        assert self.view.values == [4, 6]
+        with pytest.raises(IndexError):
+            self.view.values[2] = 7
+
+    def test_setting_whole_lists(self):
+        self.view.values = [7, 8, 9]
+        assert self.view.values == [7, 8, 9]
+
+    def test_setting_unknown_fields_fails(self):
+        with pytest.raises(AttributeError):
+            self.view.nope = 1
+        with pytest.raises(KeyError):
+            self.view['nope'] = 1
+
+    def test_read_only_buffers_cannot_be_set(self):
+        view = self.Form.view(bytes(self.buf), 1)
+        with pytest.raises(TypeError):
+            view.seq = 1
+
+    def test_mmap_views_are_writable(self):
+        import mmap
+        buf = mmap.mmap(-1, len(self.buf))
+        try:
+            buf[:] = bytes(self.buf)
+            view = self.Form.view(buf, 1)
+            view.seq = 0xabcd
+            assert buf[1:3] == b'\xab\xcd'
+        finally:
+            buf.close()